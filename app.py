@@ -1,10 +1,41 @@
+import os
+import time
+
 import streamlit as st
-import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import altair as alt
 from datetime import datetime, timedelta
 
+from metric_drift import (
+    AVG_DIVERGENCE,
+    DEFAULT_MAX_POINTS,
+    DEFAULT_TRANSFORMS,
+    EXPORT_FORMATS,
+    GRANULARITIES,
+    SIMULATION_CACHE,
+    TEAM_REGISTRY,
+    IncrementalSimulation,
+    Scenario,
+    ScenarioStore,
+    StageTimer,
+    divergence_chart_data,
+    detect_drift,
+    divergence_summary,
+    downsample_long,
+    ensemble_bands,
+    export_bytes,
+    ingest_logs,
+    load_events,
+    make_key,
+    profile_report,
+    run_key,
+    run_scenarios,
+    scenario_deltas,
+    scenario_summary,
+    serve_in_background,
+    start_profile,
+)
+
 # Set page config
 st.set_page_config(
     page_title="Metric Drift Simulator",
@@ -13,6 +44,18 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Hidden performance instrumentation, enabled with ?perf=1 or METRIC_DRIFT_PERF=1.
+# When off, every stage below runs in a shared no-op context
+perf_enabled = os.environ.get("METRIC_DRIFT_PERF") == "1" or st.query_params.get("perf") == "1"
+rerun_start = time.perf_counter()
+profiler = start_profile() if perf_enabled and st.session_state.pop("profile_rerun", False) else None
+timer = StageTimer(perf_enabled, track_allocations=st.session_state.get("track_allocations", False))
+
+# Serve the HTTP API from this process as well, so it shares the simulation cache
+if os.environ.get("METRIC_DRIFT_API_PORT"):
+    serve_in_background(int(os.environ["METRIC_DRIFT_API_PORT"]),
+                        address=os.environ.get("METRIC_DRIFT_API_ADDRESS"))
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -69,17 +112,33 @@ the same metric.
 # Sidebar for simulation parameters
 st.sidebar.markdown("## Simulation Parameters")
 
+# Data source: synthesized curves or the team pipelines run over a real event log
+st.sidebar.markdown("### Data Source")
+data_source = st.sidebar.radio("Metric Source", ["Simulation", "Event Log"], horizontal=True)
+uploaded_log = None
+if data_source == "Event Log":
+    uploaded_log = st.sidebar.file_uploader(
+        "Event Log (CSV or Parquet)", type=["csv", "parquet"],
+        help="Needs user_id and timestamp columns, plus event_type and charge_amount for the team filters"
+    )
+    distinct_method = st.sidebar.selectbox(
+        "Distinct User Counting", ["Exact", "HyperLogLog"],
+        help="HyperLogLog uses fixed memory per period at about 1.6% relative error"
+    )
+    if uploaded_log is None:
+        st.sidebar.info("Upload an event log to analyze it; showing simulated data until then.")
+using_logs = uploaded_log is not None
+
 # Time parameters
 st.sidebar.markdown("### Time Range")
 start_date = st.sidebar.date_input("Start Date", datetime.now() - timedelta(days=90))
 end_date = st.sidebar.date_input("End Date", datetime.now())
-time_granularity = st.sidebar.selectbox("Time Granularity", ["Daily", "Weekly", "Monthly"], index=1)
+time_granularity = st.sidebar.selectbox("Time Granularity", GRANULARITIES, index=1)
 
 # Team parameters
 st.sidebar.markdown("### Teams")
-include_finance = st.sidebar.checkbox("Finance Team", value=True)
-include_product = st.sidebar.checkbox("Product Team", value=True)
-include_marketing = st.sidebar.checkbox("Marketing Team", value=True)
+included_teams = [name for name, spec in TEAM_REGISTRY.items()
+                  if st.sidebar.checkbox(f"{name} Team", value=spec.enabled)]
 
 # Drift parameters
 st.sidebar.markdown("### Drift Factors")
@@ -91,178 +150,156 @@ seasonality = st.sidebar.slider("Seasonality Effect", 0.0, 1.0, 0.3,
                               help="Controls the strength of seasonal patterns in the data")
 noise_level = st.sidebar.slider("Random Noise", 0.0, 0.5, 0.1,
                               help="Controls the amount of random variation in the metric")
+seed = st.sidebar.number_input("Random Seed", min_value=0, value=42, step=1,
+                               help="Runs with the same parameters and seed produce identical data")
 
 # Advanced parameters (collapsible)
 with st.sidebar.expander("Advanced Parameters"):
-    finance_modifier = st.slider("Finance Context Weight", 0.5, 1.5, 1.2, 
-                               help="How much Finance team's context affects their metric definition")
-    product_modifier = st.slider("Product Context Weight", 0.5, 1.5, 0.8,
-                               help="How much Product team's context affects their metric definition")
-    marketing_modifier = st.slider("Marketing Context Weight", 0.5, 1.5, 1.0,
-                                 help="How much Marketing team's context affects their metric definition")
+    context_weights = {
+        name: st.slider(f"{name} Context Weight", 0.5, 1.5, spec.default_weight,
+                        help=f"How much {name} team's context affects their metric definition")
+        for name, spec in TEAM_REGISTRY.items()
+    }
     
     show_annotations = st.checkbox("Show Event Annotations", value=True,
                                  help="Display key events that affected metric definitions")
 
-# Generate time series data
-def generate_dates(start_date, end_date, granularity):
-    delta = (end_date - start_date).days
-    if granularity == "Daily":
-        return [start_date + timedelta(days=i) for i in range(delta + 1)]
-    elif granularity == "Weekly":
-        return [start_date + timedelta(days=i*7) for i in range(delta // 7 + 1)]
-    else:  # Monthly
-        result = []
-        current = start_date
-        while current <= end_date:
-            result.append(current)
-            # Add a month
-            month = current.month + 1
-            year = current.year
-            if month > 12:
-                month = 1
-                year += 1
-            # Handle edge cases for month lengths
-            day = min(current.day, 28)  # Simplification to avoid month length issues
-            current = current.replace(year=year, month=month, day=day)
-        return result
-
-# Simulate metric drift
-def simulate_metric_drift(dates, base_drift, context_factor, seasonality, noise_level, 
-                          finance_mod, product_mod, marketing_mod):
-    # Convert dates to numeric for calculations
-    date_nums = [(d - dates[0]).days for d in dates]
-    max_days = date_nums[-1] if date_nums else 0
-    
-    # Base metric function (common starting point)
-    def base_metric(t):
-        # Base value with some growth
-        base = 100 + 0.05 * t
-        # Add seasonality (if enabled)
-        if seasonality > 0:
-            # Yearly seasonality pattern
-            yearly_cycle = np.sin(2 * np.pi * t / 365) * 10 * seasonality
-            # Weekly seasonality pattern (for higher frequency data)
-            weekly_cycle = np.sin(2 * np.pi * t / 7) * 5 * seasonality
-            base += yearly_cycle + weekly_cycle
-        return base
-    
-    # Generate data for each team
-    results = []
-    
-    # Key events that cause definition changes
-    events = []
-    if max_days >= 30:
-        events.append({
-            'day': min(30, max_days // 3),
-            'description': "Finance team adds attribution window adjustment"
-        })
-    if max_days >= 60:
-        events.append({
-            'day': min(60, max_days // 2),
-            'description': "Product team filters out test accounts"
-        })
-    if max_days >= 90:
-        events.append({
-            'day': min(90, max_days * 2 // 3),
-            'description': "Marketing team changes channel grouping logic"
-        })
-    
-    for i, d in enumerate(dates):
-        t = date_nums[i]
-        point = {"date": d, "day": t}
-        
-        # Calculate base value
-        base_value = base_metric(t)
-        
-        # Add team-specific transformations
-        
-        # Finance team (tends to be conservative, focuses on recognized revenue)
-        if include_finance:
-            # Progressive drift based on finance-specific context
-            finance_drift = base_drift * t * 0.15 * finance_mod
-            # Step changes at specific events
-            for event in events:
-                if t >= event['day'] and "Finance" in event['description']:
-                    finance_drift += 5 * context_factor * finance_mod
-            
-            # Add noise
-            finance_noise = np.random.normal(0, base_value * noise_level * 0.5)
-            
-            # Final finance metric value
-            finance_value = base_value * (1 + 0.1 * context_factor * finance_mod) - finance_drift + finance_noise
-            point["Finance"] = max(0, finance_value)  # Ensure non-negative
-        
-        # Product team (focuses on user engagement and product usage)
-        if include_product:
-            # Progressive drift based on product-specific context
-            product_drift = base_drift * t * 0.2 * product_mod
-            # Step changes at specific events
-            for event in events:
-                if t >= event['day'] and "Product" in event['description']:
-                    product_drift -= 8 * context_factor * product_mod  # Product team filters out data
-            
-            # Add noise
-            product_noise = np.random.normal(0, base_value * noise_level * 0.7)
-            
-            # Final product metric value
-            product_value = base_value * (1 - 0.05 * context_factor * product_mod) - product_drift + product_noise
-            point["Product"] = max(0, product_value)  # Ensure non-negative
-        
-        # Marketing team (focuses on attribution and campaign performance)
-        if include_marketing:
-            # Progressive drift based on marketing-specific context
-            marketing_drift = base_drift * t * 0.25 * marketing_mod
-            # Step changes at specific events
-            for event in events:
-                if t >= event['day'] and "Marketing" in event['description']:
-                    marketing_drift += 12 * context_factor * marketing_mod  # Marketing changes attribution
-            
-            # Add noise
-            marketing_noise = np.random.normal(0, base_value * noise_level)
-            
-            # Final marketing metric value
-            marketing_value = base_value * (1 + 0.15 * context_factor * marketing_mod) + marketing_drift + marketing_noise
-            point["Marketing"] = max(0, marketing_value)  # Ensure non-negative
-        
-        # Add the data point
-        results.append(point)
-    
-    return pd.DataFrame(results), events
-
-# Generate dates based on parameters
-dates = generate_dates(start_date, end_date, time_granularity)
-
-# Run simulation
-df, events = simulate_metric_drift(
-    dates, 
-    base_drift, 
-    context_factor, 
-    seasonality, 
-    noise_level,
-    finance_modifier,
-    product_modifier,
-    marketing_modifier
-)
+    drift_detection = st.checkbox("Detect Drift", value=True,
+                                  help="Mark change points in the average divergence and periods where "
+                                       "the teams' spread exceeds the tolerance")
+    drift_method = st.selectbox("Change-Point Method", ["CUSUM", "Page-Hinkley"], disabled=not drift_detection,
+                                help="CUSUM compares against the first window's baseline; Page-Hinkley "
+                                     "against the running mean")
+    drift_window = st.number_input("Drift Window (periods)", min_value=2, max_value=365, value=12, step=1,
+                                   disabled=not drift_detection,
+                                   help="Periods in the rolling statistics and the change-point baseline")
+    drift_tolerance = st.slider("Divergence Tolerance (%)", 1, 100, 25, disabled=not drift_detection,
+                                help="Flag periods where the rolling spread between the highest and lowest "
+                                     "team exceeds this share of the mean team value")
+
+    event_file = st.file_uploader("Event Schedule (JSON or CSV)", type=["json", "csv"],
+                                  help="Replaces the built-in events. Fields: team, day, description, "
+                                       "shape (step or ramp), magnitude, ramp_days, half_life")
+
+    ensemble_mode = st.checkbox("Monte Carlo Ensemble", value=False,
+                                help="Simulate many noisy replicates and show 5th-95th percentile bands")
+    ensemble_replicates = st.number_input("Ensemble Replicates", min_value=100, max_value=10000,
+                                          value=1000, step=100, disabled=not ensemble_mode,
+                                          help="Number of replicates in the ensemble")
+
+    max_chart_points = st.number_input("Max Chart Points", min_value=200, max_value=50000,
+                                       value=DEFAULT_MAX_POINTS, step=100,
+                                       help="Charts are downsampled to about this many points, keeping "
+                                            "peaks and event steps; the CSV download keeps every point")
+
+# Custom event schedule, if one was uploaded and parses
+custom_events = None
+if event_file is not None:
+    try:
+        event_file.seek(0)
+        custom_events = load_events(event_file)
+    except ValueError as error:
+        st.sidebar.error(f"Could not load the event schedule: {error}")
+
+if using_logs:
+    # Per-team distinct users per period, from the team pipelines' filters
+    log_transforms = {name: DEFAULT_TRANSFORMS[name] for name in included_teams if name in DEFAULT_TRANSFORMS}
+    included_teams = list(log_transforms)
+    simulation_key = make_key("log", uploaded_log.file_id, start_date, end_date, time_granularity,
+                              distinct_method, included_teams)
+    with timer.stage("log ingestion"):
+        result = SIMULATION_CACHE.get_or_compute(
+            ("simulation",) + simulation_key,
+            lambda: ingest_logs(uploaded_log, start_date, end_date, time_granularity, log_transforms,
+                                method="hll" if distinct_method == "HyperLogLog" else "exact"),
+        )
+    events = result.events
+
+team_weights = {name: context_weights[name] for name in included_teams}
+simulation_run_key = run_key(start_date, time_granularity, base_drift, context_factor, seasonality,
+                             noise_level, team_weights, seed,
+                             event_file.file_id if custom_events is not None else None)
+
+if not using_logs:
+    # Run simulation (cached on the parameters). The run itself is keyed without
+    # the end date, so moving the end date forward only simulates the new periods
+    simulation_key = simulation_run_key + make_key(end_date)
+    with timer.stage("simulation"):
+        result, events = SIMULATION_CACHE.get_or_compute(
+            ("simulation",) + simulation_key,
+            lambda: SIMULATION_CACHE.get_or_compute(
+                ("incremental",) + simulation_run_key,
+                lambda: IncrementalSimulation(
+                    start_date,
+                    time_granularity,
+                    base_drift,
+                    context_factor,
+                    seasonality,
+                    noise_level,
+                    team_weights,
+                    seed=seed,
+                    events=custom_events,
+                ),
+            ).advance(end_date),
+        )
+
+# Frame view of the columnar result (shares its arrays) for the data table
+with timer.stage("frame view"):
+    df = result.to_pandas()
+
+# Percentile bands over many replicates (cached like the single run)
+bands = None
+if ensemble_mode and included_teams and not using_logs:
+    with timer.stage("ensemble"):
+        bands = SIMULATION_CACHE.get_or_compute(
+            ("ensemble", ensemble_replicates) + simulation_key,
+            lambda: ensemble_bands(
+                result.dates,
+                base_drift,
+                context_factor,
+                seasonality,
+                noise_level,
+                team_weights,
+                replicates=ensemble_replicates,
+                seed=seed,
+                events=custom_events,
+            ),
+        )
+
+# Change points and tolerance breaches of the divergence (cached like the single run)
+drift = None
+if drift_detection and len(included_teams) >= 2:
+    with timer.stage("drift detection"):
+        drift = SIMULATION_CACHE.get_or_compute(
+            ("drift", drift_method, drift_window, drift_tolerance) + simulation_key,
+            lambda: detect_drift(result.matrix, window=drift_window, tolerance=drift_tolerance / 100,
+                                 method=drift_method.lower()),
+        )
 
 # Main content area
 st.markdown("<div class='sub-header'>Metric Drift Visualization</div>", unsafe_allow_html=True)
 
 # Create tabs for different visualizations
-tab1, tab2, tab3 = st.tabs(["Time Series", "Divergence Analysis", "Data Table"])
+tab1, tab2, tab3, tab4 = st.tabs(["Time Series", "Divergence Analysis", "Data Table", "Scenarios"])
 
 with tab1:
-    # Prepare data for visualization
-    chart_data = df.melt(id_vars=['date', 'day'], var_name='Team', value_name='Metric Value')
+    # Prepare data for visualization, downsampled to the chart point budget
+    with timer.stage("team chart data"):
+        chart_data = SIMULATION_CACHE.get_or_compute(
+            ("chart", max_chart_points) + simulation_key,
+            lambda: downsample_long(result.long_frame(), 'Team', 'Metric Value', max_chart_points),
+        )
+    
+    team_scale = alt.Scale(
+        domain=list(TEAM_REGISTRY),
+        range=[spec.color for spec in TEAM_REGISTRY.values()]
+    )
     
     # Create the base chart
     chart = alt.Chart(chart_data).mark_line().encode(
         x=alt.X('date:T', title='Date'),
         y=alt.Y('Metric Value:Q', title='Metric Value'),
-        color=alt.Color('Team:N', scale=alt.Scale(
-            domain=['Finance', 'Product', 'Marketing'],
-            range=['#047857', '#4F46E5', '#B91C1C']
-        )),
+        color=alt.Color('Team:N', scale=team_scale),
         tooltip=['date:T', 'Team:N', 'Metric Value:Q']
     ).properties(
         width='container',
@@ -270,12 +307,27 @@ with tab1:
         title='Metric Values Across Teams Over Time'
     )
     
+    # Shade the ensemble's 5th-95th percentile band behind each team's line
+    if bands is not None:
+        team_bands = downsample_long(
+            bands[bands['series'] != AVG_DIVERGENCE].rename(columns={'series': 'Team'}),
+            'Team', ['p5', 'p95'], max_chart_points
+        )
+        band_chart = alt.Chart(team_bands).mark_area(opacity=0.2).encode(
+            x='date:T',
+            y=alt.Y('p5:Q', title='Metric Value'),
+            y2='p95:Q',
+            color=alt.Color('Team:N', scale=team_scale)
+        )
+        chart = alt.layer(band_chart, chart)
+    
     # Add annotations if enabled
     if show_annotations and events:
         # Convert events to DataFrame for Altair
         event_df = pd.DataFrame([
-            {'day': e['day'], 'date': dates[0] + timedelta(days=e['day']), 'description': e['description']}
-            for e in events if e['day'] <= df['day'].max()
+            {'day': e.day, 'date': df['date'].iloc[0] + timedelta(days=e.day),
+             'description': e.description or f"{e.team} event"}
+            for e in events if e.day <= df['day'].max()
         ])
         
         # Create vertical rules for events
@@ -304,8 +356,39 @@ with tab1:
         # Combine charts
         chart = alt.layer(chart, event_rules, event_text)
     
+    # Mark detected drift: change-point starts and the first period of each tolerance breach
+    if drift is not None and (drift['change_points'] or drift['breaches']):
+        drift_df = pd.DataFrame(
+            [{'date': result.dates[start], 'description': f"Drift starts ({drift_method})"}
+             for start, _ in drift['change_points']]
+            + [{'date': result.dates[start], 'description': f"Spread > {drift_tolerance}%"}
+               for start, _ in drift['breaches']]
+        )
+        drift_rules = alt.Chart(drift_df).mark_rule(
+            color='darkorange',
+            strokeDash=[2, 2],
+            opacity=0.7
+        ).encode(
+            x='date:T',
+            tooltip=['date:T', 'description:N']
+        )
+        drift_text = alt.Chart(drift_df).mark_text(
+            align='left',
+            baseline='top',
+            fontSize=12,
+            angle=270,
+            dx=5,
+            dy=10
+        ).encode(
+            x='date:T',
+            text='description:N',
+            color=alt.value('darkorange')
+        )
+        chart = alt.layer(chart, drift_rules, drift_text)
+    
     # Display the chart
-    st.altair_chart(chart, use_container_width=True)
+    with timer.stage("team chart render"):
+        st.altair_chart(chart, use_container_width=True)
     
     # Add explanation
     st.markdown("""
@@ -317,37 +400,21 @@ with tab1:
     3. Incremental changes that compound over time
     4. Key events that trigger definition changes (shown as vertical lines)
     """)
+    if drift is not None:
+        st.caption("Orange lines: detected drift (change points in the average divergence and "
+                   "periods where the teams' spread exceeds the tolerance).")
 
 with tab2:
     # Calculate divergence metrics
     if len(df.columns) > 2:  # Need at least one team
-        # Create a copy for analysis
-        analysis_df = df.copy()
-        
-        # Calculate team-to-team differences
-        teams = [col for col in df.columns if col not in ['date', 'day']]
-        
-        if len(teams) >= 2:
-            # Calculate pairwise differences
-            for i in range(len(teams)):
-                for j in range(i+1, len(teams)):
-                    team1 = teams[i]
-                    team2 = teams[j]
-                    diff_col = f"{team1} vs {team2}"
-                    analysis_df[diff_col] = (analysis_df[team1] - analysis_df[team2]).abs()
-            
-            # Calculate average divergence over time
-            analysis_df['Avg Divergence'] = analysis_df[[f"{teams[i]} vs {teams[j]}" 
-                                                      for i in range(len(teams)) 
-                                                      for j in range(i+1, len(teams))]].mean(axis=1)
-            
-            # Plot the divergence
-            divergence_data = analysis_df.melt(
-                id_vars=['date', 'day'], 
-                value_vars=[f"{teams[i]} vs {teams[j]}" for i in range(len(teams)) for j in range(i+1, len(teams))],
-                var_name='Team Comparison', 
-                value_name='Absolute Difference'
-            )
+        if len(included_teams) >= 2:
+            # Per-pair differences in long form for the chart, downsampled (cached with the simulation)
+            with timer.stage("divergence chart data"):
+                divergence_data = SIMULATION_CACHE.get_or_compute(
+                    ("divergence", max_chart_points) + simulation_key,
+                    lambda: downsample_long(divergence_chart_data(result), 'Team Comparison', 'Absolute Difference',
+                                            max_chart_points),
+                )
             
             # Create divergence chart
             divergence_chart = alt.Chart(divergence_data).mark_line().encode(
@@ -361,8 +428,28 @@ with tab2:
                 title='Metric Divergence Between Teams'
             )
             
+            # Ensemble band and median of the average divergence
+            if bands is not None:
+                avg_bands = downsample_long(bands[bands['series'] == AVG_DIVERGENCE], 'series',
+                                            ['p5', 'p50', 'p95'], max_chart_points)
+                avg_band_chart = alt.Chart(avg_bands).mark_area(opacity=0.2, color='gray').encode(
+                    x='date:T',
+                    y=alt.Y('p5:Q', title='Absolute Difference'),
+                    y2='p95:Q',
+                    tooltip=['date:T', 'p5:Q', 'p50:Q', 'p95:Q']
+                )
+                avg_median_chart = alt.Chart(avg_bands).mark_line(color='gray', strokeDash=[4, 2]).encode(
+                    x='date:T',
+                    y='p50:Q'
+                )
+                divergence_chart = alt.layer(avg_band_chart, avg_median_chart, divergence_chart)
+            
             # Display the chart
-            st.altair_chart(divergence_chart, use_container_width=True)
+            with timer.stage("divergence chart render"):
+                st.altair_chart(divergence_chart, use_container_width=True)
+            if bands is not None:
+                st.caption(f"Gray band: 5th-95th percentile of the average divergence across "
+                           f"{ensemble_replicates} replicates (dashed line: median).")
             
             # Add explanation
             st.markdown("""
@@ -379,7 +466,8 @@ with tab2:
             st.markdown("<div class='sub-header'>Divergence Statistics</div>", unsafe_allow_html=True)
             
             # Calculate statistics for the last data point
-            last_point = analysis_df.iloc[-1]
+            with timer.stage("divergence summary"):
+                summary = divergence_summary(result.matrix)
             
             # Create three columns for stats
             col1, col2, col3 = st.columns(3)
@@ -387,27 +475,35 @@ with tab2:
             with col1:
                 st.metric(
                     "Max Team Divergence", 
-                    f"{last_point[[f'{teams[i]} vs {teams[j]}' for i in range(len(teams)) for j in range(i+1, len(teams))]].max():.1f}",
-                    delta=f"{last_point[[f'{teams[i]} vs {teams[j]}' for i in range(len(teams)) for j in range(i+1, len(teams))]].max() - analysis_df.iloc[0][[f'{teams[i]} vs {teams[j]}' for i in range(len(teams)) for j in range(i+1, len(teams))]].max():.1f}"
+                    f"{summary['max_divergence']:.1f}",
+                    delta=f"{summary['max_delta']:.1f}"
                 )
             
             with col2:
                 st.metric(
                     "Average Divergence", 
-                    f"{last_point['Avg Divergence']:.1f}",
-                    delta=f"{last_point['Avg Divergence'] - analysis_df.iloc[0]['Avg Divergence']:.1f}"
+                    f"{summary['avg_divergence']:.1f}",
+                    delta=f"{summary['avg_delta']:.1f}"
                 )
             
             with col3:
-                # Calculate percent change from start to end
-                start_avg = analysis_df.iloc[0]['Avg Divergence']
-                end_avg = last_point['Avg Divergence']
-                pct_change = ((end_avg - start_avg) / start_avg * 100) if start_avg > 0 else 0
-                
+                # Percent change from start to end
                 st.metric(
                     "Divergence Growth", 
-                    f"{pct_change:.1f}%",
-                    delta=f"{pct_change:.1f}%"
+                    f"{summary['growth_pct']:.1f}%",
+                    delta=f"{summary['growth_pct']:.1f}%"
+                )
+            
+            # When the drift started, according to the detector
+            if drift is not None:
+                period = lambda k: f"{pd.Timestamp(result.dates[k]):%Y-%m-%d}"
+                changes = ", ".join(f"{period(start)} (alarm {period(alarm)})"
+                                    for start, alarm in drift['change_points'])
+                breach = drift['breaches'][0][0] if drift['breaches'] else None
+                st.markdown(
+                    f"**Drift detection ({drift_method}, {drift_window}-period window):** "
+                    f"change points {changes or 'none'}; spread beyond {drift_tolerance}% "
+                    + (f"from {period(breach)}." if breach is not None else "not reached.")
                 )
         else:
             st.info("Select at least two teams to see divergence analysis")
@@ -415,17 +511,96 @@ with tab2:
         st.info("Select at least one team to see divergence analysis")
 
 with tab3:
-    # Display the raw data
-    st.dataframe(df)
+    # Display the raw data one page at a time so only that page is serialized
+    page_size = 500
+    page_count = max(1, -(-len(df) // page_size))
+    page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1) if page_count > 1 else 1
+    page_start = (page - 1) * page_size
+    with timer.stage("data table render"):
+        st.dataframe(df.iloc[page_start:page_start + page_size],
+                     column_config={"date": st.column_config.DateColumn("date")})
+    st.caption(f"Rows {min(page_start + 1, len(df))}-{min(page_start + page_size, len(df))} of {len(df)}")
     
-    # Add download button
-    csv = df.to_csv(index=False)
-    st.download_button(
-        label="Download Data as CSV",
-        data=csv,
-        file_name="metric_drift_simulation.csv",
-        mime="text/csv",
-    )
+    # Build the export only when asked for, then offer it for download
+    export_format = st.radio("Export Format", list(EXPORT_FORMATS), horizontal=True)
+    export_request = (export_format,) + simulation_key
+    if st.button("Prepare Download"):
+        with timer.stage("export"):
+            st.session_state.export = (export_request, export_bytes(result, export_format))
+    if st.session_state.get("export", (None,))[0] == export_request:
+        mime, extension = EXPORT_FORMATS[export_format]
+        st.download_button(
+            label=f"Download Data as {export_format}",
+            data=st.session_state.export[1],
+            file_name=f"metric_drift_simulation{extension}",
+            mime=mime,
+        )
+
+with tab4:
+    # What-if comparison: the sidebar configuration against edited copies of it,
+    # all drawn from the same noise so only the parameters differ
+    if using_logs:
+        st.info("Scenario comparison simulates runs, so it is not available for ingested logs")
+    elif not included_teams:
+        st.info("Select at least one team to compare scenarios")
+    elif st.checkbox("Compare Scenarios", value=False,
+                     help="Evaluate edited copies of the sidebar configuration with the same random noise"):
+        alternative_count = st.number_input("Alternative Scenarios", min_value=1, max_value=4, value=1, step=1)
+        current_events = tuple(custom_events) if custom_events is not None else None
+        scenarios = [Scenario("Current", base_drift, context_factor, seasonality, noise_level, team_weights,
+                              events=current_events)]
+        for k, column in enumerate(st.columns(alternative_count)):
+            with column:
+                scenarios.append(Scenario(
+                    st.text_input("Scenario Name", f"Scenario {k + 1}", key=f"scenario_name_{k}"),
+                    st.slider("Base Drift Factor", 0.0, 1.0, base_drift, key=f"scenario_base_drift_{k}"),
+                    st.slider("Contextual Modifier", 0.0, 2.0, context_factor, key=f"scenario_context_{k}"),
+                    st.slider("Seasonality Effect", 0.0, 1.0, seasonality, key=f"scenario_seasonality_{k}"),
+                    st.slider("Random Noise", 0.0, 0.5, noise_level, key=f"scenario_noise_{k}"),
+                    {name: st.slider(f"{name} Context Weight", 0.5, 1.5, weight, key=f"scenario_{name}_weight_{k}")
+                     for name, weight in team_weights.items()},
+                    events=current_events,
+                    without_events=tuple(st.multiselect("Without Events Of", included_teams,
+                                                        key=f"scenario_without_{k}",
+                                                        help="Drop these teams' definition changes")),
+                ))
+
+        # Saved scenarios are reloaded; new ones are only written on request, and
+        # the store prunes the least recently used beyond its size limit
+        scenario_dir = os.environ.get("METRIC_DRIFT_SCENARIO_DIR", ".metric_drift_scenarios")
+        save_scenarios = st.button("Save Scenarios",
+                                   help=f"Store these scenarios' results in {scenario_dir} so identical "
+                                        f"definitions are reloaded instead of recomputed")
+        try:
+            with timer.stage("scenarios"):
+                scenario_results = run_scenarios(scenarios, start_date, end_date, time_granularity, seed,
+                                                 included_teams,
+                                                 store=ScenarioStore(scenario_dir),
+                                                 save=save_scenarios)
+        except ValueError as error:
+            st.error(str(error))
+        else:
+            st.dataframe(scenario_summary(scenario_results).round(2), hide_index=True)
+            st.caption(f"Final values and divergence statistics; Δ columns are differences from "
+                       f"\"Current\". Saved scenarios are stored by definition hash in {scenario_dir} "
+                       f"and reloaded from there when unchanged.")
+
+            deltas = downsample_long(scenario_deltas(scenario_results).assign(
+                Line=lambda d: d['Scenario'] + ': ' + d['Series']), 'Line', 'Delta', max_chart_points)
+            delta_chart = alt.Chart(deltas).mark_line().encode(
+                x=alt.X('date:T', title='Date'),
+                y=alt.Y('Delta:Q', title='Difference from Current'),
+                color=alt.Color('Series:N'),
+                strokeDash=alt.StrokeDash('Scenario:N'),
+                detail='Line:N',
+                tooltip=['date:T', 'Scenario:N', 'Series:N', 'Delta:Q']
+            ).properties(
+                width='container',
+                height=400,
+                title='Per-Team and Divergence Deltas Against the Current Scenario'
+            )
+            with timer.stage("scenario chart render"):
+                st.altair_chart(delta_chart, use_container_width=True)
 
 # Add insights section
 st.markdown("<div class='sub-header'>Key Insights</div>", unsafe_allow_html=True)
@@ -457,10 +632,10 @@ with col2:
     st.markdown("</div>", unsafe_allow_html=True)
 
 # Add team-specific explanations
-if include_finance or include_product or include_marketing:
+if included_teams:
     st.markdown("<div class='sub-header'>Team-Specific Context</div>", unsafe_allow_html=True)
     
-    if include_finance:
+    if "Finance" in included_teams:
         st.markdown("<div class='team-label-finance'>Finance Team Perspective</div>", unsafe_allow_html=True)
         st.markdown("""
         The Finance team focuses on recognized revenue and financial reporting. Their metric adjustments typically:
@@ -471,7 +646,7 @@ if include_finance or include_product or include_marketing:
         * Align with external reporting requirements
         """)
     
-    if include_product:
+    if "Product" in included_teams:
         st.markdown("<div class='team-label-product'>Product Team Perspective</div>", unsafe_allow_html=True)
         st.markdown("""
         The Product team focuses on user experience and product usage. Their metric adjustments typically:
@@ -482,7 +657,7 @@ if include_finance or include_product or include_marketing:
         * Normalize for A/B test variations
         """)
     
-    if include_marketing:
+    if "Marketing" in included_teams:
         st.markdown("<div class='team-label-marketing'>Marketing Team Perspective</div>", unsafe_allow_html=True)
         st.markdown("""
         The Marketing team focuses on campaign performance and attribution. Their metric adjustments typically:
@@ -515,3 +690,31 @@ st.markdown("""
 For a deeper exploration of these concepts, read the full article: 
 [Why the Metrics Layer Still Isn't Enough: Toward a Flexible & Governed Data Ecosystem](https://teekag.github.io/portfolio-website/blog/metrics-ecosystem)
 """)
+
+# Cache counters, taken after this rerun's lookups
+cache_stats = SIMULATION_CACHE.stats()
+st.sidebar.caption(f"Simulation cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                   f"{cache_stats['size']}/{cache_stats['maxsize']} entries")
+
+# Performance expander (only with instrumentation on): this rerun's stage
+# timings, optional allocation peaks and an opt-in profile of one rerun
+if perf_enabled:
+    rerun_seconds = time.perf_counter() - rerun_start
+    if profiler is not None:
+        st.session_state.profile_report = profile_report(profiler)
+    timer.finish(os.environ.get("METRIC_DRIFT_METRICS_FILE"), rerun_seconds=rerun_seconds,
+                 source=data_source, granularity=time_granularity, periods=len(df),
+                 teams=len(included_teams))
+    with st.sidebar.expander("Performance"):
+        st.checkbox("Track Allocations", key="track_allocations",
+                    help="Record each stage's peak traced memory (tracemalloc slows the app down)")
+        stage_table = pd.DataFrame(timer.records, columns=["stage", "seconds", "peak_bytes"])
+        stage_table["ms"] = stage_table.pop("seconds") * 1e3
+        stage_table["peak MiB"] = stage_table.pop("peak_bytes") / 2**20
+        st.dataframe(stage_table, hide_index=True)
+        st.caption(f"Rerun: {rerun_seconds * 1e3:.0f} ms, {timer.total() * 1e3:.0f} ms in timed stages")
+        if st.button("Profile Next Rerun", help="Run the app under cProfile the next time it reruns"):
+            st.session_state.profile_rerun = True
+            st.caption("The next rerun will be profiled.")
+        if "profile_report" in st.session_state:
+            st.code(st.session_state.profile_report, language=None)
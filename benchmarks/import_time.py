@@ -0,0 +1,66 @@
+"""Import-time benchmark: headless simulation core vs. the Streamlit app's imports.
+
+Each statement is timed in fresh interpreters (so nothing is served from
+``sys.modules``) and the median wall time is reported. The "streamlit app"
+row is what every batch job paid before the core was split out of
+``app.py``: Streamlit, Altair, pandas and NumPy (Matplotlib, imported but
+unused, is no longer a requirement). The other rows are reported relative
+to it, unless it fails to import.
+
+    python benchmarks/import_time.py [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ("streamlit app", "import streamlit, altair, pandas, numpy"),
+    ("metric_drift", "import metric_drift"),
+    ("metric_drift.engine", "from metric_drift.engine import simulate_matrix"),
+    ("metric_drift.sweep", "from metric_drift.sweep import run_sweep"),
+    ("first simulated frame", "from datetime import date; from metric_drift import simulate_metric_drift; "
+                              "simulate_metric_drift([date(2024, 1, 1)], 0.2, 1.0, 0.3, 0.1, {'Finance': 1.2})"),
+]
+
+
+def time_import(statement, repeat):
+    """Median seconds to start a fresh interpreter and run ``statement``."""
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", statement], env=env, capture_output=True)
+        timings.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            return None
+    return statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per case")
+    args = parser.parse_args(argv)
+
+    baseline = time_import("pass", args.repeat)
+    reference = None
+    print(f"{'case':<30}{'median (s)':>12}{'vs app':>10}")
+    for k, (name, statement) in enumerate(CASES):
+        seconds = time_import(statement, args.repeat)
+        if seconds is None:
+            print(f"{name:<30}{'failed':>12}")
+            continue
+        # Interpreter startup is the same for every case, so compare what is left
+        seconds = max(0.0, seconds - baseline)
+        if k == 0:
+            reference = seconds
+        ratio = f"{seconds / reference:>10.1%}" if reference else ""
+        print(f"{name:<30}{seconds:>12.3f}{ratio}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Memory benchmark: columnar ``SimulationResult`` vs. building frames from rows.
+
+Each case runs the same simulation and assembles its result, reporting the
+peak traced allocation of the run, the memory the result keeps and the wall
+time. "list of dicts" is how the original loop assembled its frame
+(one dict per date, then ``pd.DataFrame(results)``); "dict of arrays" is a
+frame built from one array per column. Every case runs once unmeasured
+first, so one-off costs such as importing pandas are not charged to it.
+
+    python benchmarks/result_memory.py [--years N] [--teams N] [--granularity G]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metric_drift import TEAM_REGISTRY, TeamSpec, generate_dates, simulate, simulate_matrix
+
+PARAMS = (0.2, 1.0, 0.3, 0.1)
+
+
+def make_registry(teams):
+    """The default teams, plus copies of them cycled up to ``teams`` entries."""
+    specs = list(TEAM_REGISTRY.values())
+    registry = dict(TEAM_REGISTRY)
+    for k in range(len(specs), teams):
+        spec = specs[k % len(specs)]
+        registry[f"{spec.name} {k}"] = TeamSpec(f"{spec.name} {k}", spec.level, spec.drift_rate,
+                                                spec.drift_sign, spec.event_step, spec.noise_scale)
+    return {name: registry[name] for name in list(registry)[:teams]}
+
+
+def list_of_dicts(dates, weights, registry):
+    import pandas as pd
+
+    values, terms = simulate_matrix(dates, *PARAMS, weights, 0, registry)
+    results = []
+    for i, d in enumerate(dates.tolist()):
+        point = {"date": d, "day": int(terms["t"][i])}
+        for k, team in enumerate(weights):
+            point[team] = float(values[i, k])
+        results.append(point)
+    return pd.DataFrame(results)
+
+
+def dict_of_arrays(dates, weights, registry):
+    import pandas as pd
+
+    values, terms = simulate_matrix(dates, *PARAMS, weights, 0, registry)
+    columns = {"date": dates.astype('datetime64[ns]'), "day": terms["t"]}
+    columns.update(zip(weights, values.T))
+    return pd.DataFrame(columns)
+
+
+def columnar(dtype):
+    def build(dates, weights, registry):
+        return simulate(dates, *PARAMS, weights, 0, registry, dtype)
+    return build
+
+
+CASES = [
+    ("list of dicts", list_of_dicts),
+    ("dict of arrays", dict_of_arrays),
+    ("SimulationResult float64", columnar(np.float64)),
+    ("SimulationResult float32", columnar(np.float32)),
+]
+
+
+def measure(build, *args):
+    """Peak and retained traced bytes and seconds of ``build(*args)``, after one warm-up call."""
+    build(*args)
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(*args)
+    seconds = time.perf_counter() - start
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, retained, seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=10, help="Simulated years from 2020-01-01")
+    parser.add_argument("--teams", type=int, default=20, help="Number of simulated teams")
+    parser.add_argument("--granularity", default="Daily", help="Calendar granularity")
+    args = parser.parse_args(argv)
+
+    registry = make_registry(args.teams)
+    weights = {name: spec.default_weight for name, spec in registry.items()}
+    dates = generate_dates(date(2020, 1, 1), date(2020 + args.years, 1, 1), args.granularity)
+    inputs = (dates, weights, registry)
+
+    print(f"{len(dates)} periods x {len(weights)} teams")
+    print(f"{'case':<28}{'peak (MiB)':>12}{'kept (MiB)':>12}{'time (s)':>10}")
+    for name, build in CASES:
+        peak, retained, seconds = measure(build, *inputs)
+        print(f"{name:<28}{peak / 2**20:>12.2f}{retained / 2**20:>12.2f}{seconds:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
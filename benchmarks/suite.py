@@ -0,0 +1,213 @@
+"""Benchmark suite for the simulation, divergence, chart-data and export stages.
+
+Every stage runs over a matrix of date ranges, team counts and
+granularities. Each case is timed ``--repeat`` times (median and best wall
+time are reported) and run once more under ``tracemalloc`` for its peak
+traced allocation. Results are printed and, with ``--out``, written as JSON;
+``--compare`` flags cases that got slower or hungrier than a baseline file
+written by an earlier run, and exits with status 1 if any did.
+
+    python benchmarks/suite.py --out baseline.json
+    python benchmarks/suite.py --compare baseline.json [--tolerance 0.3]
+    python benchmarks/suite.py --spans 90 365 --teams 3 --granularities Daily
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metric_drift import (
+    divergence_chart_data,
+    divergence_series,
+    divergence_summary,
+    downsample_long,
+    export_bytes,
+    generate_dates,
+    simulate,
+    simulate_metric_drift,
+)
+from result_memory import PARAMS, make_registry
+
+START = date(2020, 1, 1)
+SPANS = (90, 365, 5 * 365, 10 * 365)
+TEAM_COUNTS = (3, 10, 30, 100)
+GRANULARITIES = ("Daily", "Weekly", "Monthly")
+
+# Pair-level chart data grows with teams squared; skip it past this many rows
+MAX_PAIR_ROWS = 2_000_000
+
+
+def _inputs(case):
+    # Everything the stages after the first need, built outside the timings
+    registry = make_registry(case["teams"])
+    weights = {name: spec.default_weight for name, spec in registry.items()}
+    dates = generate_dates(START, START + timedelta(days=case["span_days"]), case["granularity"])
+    result = simulate(dates, *PARAMS, weights, 0, registry)
+    return {"dates": dates, "weights": weights, "registry": registry, "result": result}
+
+
+def stage_generate_dates(case, inputs):
+    return lambda: generate_dates(START, START + timedelta(days=case["span_days"]), case["granularity"])
+
+
+def stage_simulate(case, inputs):
+    return lambda: simulate_metric_drift(inputs["dates"], *PARAMS, inputs["weights"], 0, inputs["registry"])
+
+
+def stage_divergence(case, inputs):
+    values = inputs["result"].matrix
+    return lambda: (divergence_series(values), divergence_summary(values))
+
+
+def stage_team_chart(case, inputs):
+    # What the Time Series tab plots: the long (melted) frame, downsampled
+    result = inputs["result"]
+    return lambda: downsample_long(result.long_frame(), "Team", "Metric Value", 2000)
+
+
+def stage_divergence_chart(case, inputs):
+    result = inputs["result"]
+    pairs = case["teams"] * (case["teams"] - 1) // 2
+    if pairs * len(result) > MAX_PAIR_ROWS:
+        return None
+    return lambda: downsample_long(divergence_chart_data(result), "Team Comparison",
+                                   "Absolute Difference", 2000)
+
+
+def stage_csv_export(case, inputs):
+    result = inputs["result"]
+    return lambda: export_bytes(result, "CSV")
+
+
+STAGES = {
+    "generate_dates": stage_generate_dates,
+    "simulate": stage_simulate,
+    "divergence": stage_divergence,
+    "team_chart": stage_team_chart,
+    "divergence_chart": stage_divergence_chart,
+    "csv_export": stage_csv_export,
+}
+
+
+def measure(run, repeat):
+    """Median and best seconds over ``repeat`` calls, and the peak traced bytes of one more."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(timings), min(timings), peak
+
+
+def case_id(record):
+    return f"{record['stage']}/{record['granularity']}/{record['span_days']}d/{record['teams']}t"
+
+
+def run_suite(spans=SPANS, team_counts=TEAM_COUNTS, granularities=GRANULARITIES, stages=None,
+              repeat=5):
+    """Yield a benchmark record per (stage, granularity, span, team count) that applies."""
+    stages = list(STAGES) if stages is None else stages
+    for granularity in granularities:
+        for span_days in spans:
+            for teams in team_counts:
+                case = {"granularity": granularity, "span_days": span_days, "teams": teams}
+                inputs = _inputs(case)
+                for stage in stages:
+                    run = STAGES[stage](case, inputs)
+                    if run is None:
+                        continue
+                    seconds, best, peak = measure(run, repeat)
+                    yield dict(stage=stage, **case, periods=len(inputs["dates"]),
+                               seconds=seconds, best_seconds=best, peak_bytes=peak)
+
+
+def compare(records, baseline, tolerance, min_seconds):
+    """(case id, what, baseline, current) for every record worse than ``baseline`` beyond ``tolerance``.
+
+    Times within ``min_seconds`` of the baseline are never flagged, so tiny
+    cases do not trip on timer noise.
+    """
+    previous = {case_id(r): r for r in baseline["results"]}
+    regressions = []
+    for record in records:
+        old = previous.get(case_id(record))
+        if old is None:
+            continue
+        if (record["seconds"] > old["seconds"] * (1 + tolerance)
+                and record["seconds"] - old["seconds"] > min_seconds):
+            regressions.append((case_id(record), "time", old["seconds"], record["seconds"]))
+        if record["peak_bytes"] > old["peak_bytes"] * (1 + tolerance):
+            regressions.append((case_id(record), "memory", old["peak_bytes"], record["peak_bytes"]))
+    return regressions
+
+
+def metadata(repeat):
+    import pandas as pd
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.platform(),
+        "repeat": repeat,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spans", type=int, nargs="+", default=SPANS, help="Date ranges in days")
+    parser.add_argument("--teams", type=int, nargs="+", default=TEAM_COUNTS, help="Team counts")
+    parser.add_argument("--granularities", nargs="+", default=GRANULARITIES)
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), help="Stages to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--out", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results to flag regressions against")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="Allowed relative slowdown or memory growth before flagging")
+    parser.add_argument("--min-seconds", type=float, default=0.002,
+                        help="Ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<40}{'periods':>9}{'median (ms)':>13}{'best (ms)':>11}{'peak (MiB)':>12}")
+    records = []
+    for record in run_suite(args.spans, args.teams, args.granularities, args.stages, args.repeat):
+        records.append(record)
+        print(f"{case_id(record):<40}{record['periods']:>9}{record['seconds'] * 1e3:>13.2f}"
+              f"{record['best_seconds'] * 1e3:>11.2f}{record['peak_bytes'] / 2**20:>12.2f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"meta": metadata(args.repeat), "results": records}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(records, baseline, args.tolerance, args.min_seconds)
+        for name, what, old, new in regressions:
+            unit, scale = ("ms", 1e3) if what == "time" else ("MiB", 2**-20)
+            print(f"REGRESSION {name} {what}: {old * scale:.2f} -> {new * scale:.2f} {unit} "
+                  f"({new / old - 1:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Simulation and analysis core of the Metric Drift Simulator.
+
+The package is importable without Streamlit, Altair or pandas: names are
+resolved from their submodules on first access, and pandas is only imported
+by the functions that build DataFrames. ``from metric_drift.engine import
+simulate_matrix`` therefore costs little more than importing NumPy, which
+keeps batch jobs and worker processes quick to start.
+"""
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "LRUCache": "cache",
+    "SIMULATION_CACHE": "cache",
+    "make_key": "cache",
+    "run_key": "cache",
+    "FISCAL_PATTERNS": "calendar",
+    "GRANULARITIES": "calendar",
+    "as_day_array": "calendar",
+    "calendar_index": "calendar",
+    "day_offsets": "calendar",
+    "generate_dates": "calendar",
+    "divergence_chart_data": "divergence",
+    "divergence_frame": "divergence",
+    "divergence_series": "divergence",
+    "divergence_summary": "divergence",
+    "max_pair_difference": "divergence",
+    "mean_pair_difference": "divergence",
+    "pair_differences": "divergence",
+    "pair_labels": "divergence",
+    "team_columns": "divergence",
+    "DEFAULT_MAX_POINTS": "downsample",
+    "downsample_indices": "downsample",
+    "downsample_long": "downsample",
+    "lttb_indices": "downsample",
+    "minmax_indices": "downsample",
+    "CHANGE_POINT_METHODS": "drift",
+    "change_points": "drift",
+    "detect_drift": "drift",
+    "rolling_stats": "drift",
+    "rolling_zscore": "drift",
+    "base_metric": "engine",
+    "simulate": "engine",
+    "simulate_matrix": "engine",
+    "simulate_metric_drift": "engine",
+    "simulate_metric_drift_reference": "engine",
+    "simulation_terms": "engine",
+    "AVG_DIVERGENCE": "ensemble",
+    "EXPORT_FORMATS": "export",
+    "export_bytes": "export",
+    "iter_csv_chunks": "export",
+    "write_csv": "export",
+    "write_parquet": "export",
+    "ensemble_bands": "ensemble",
+    "iter_ensemble_bands": "ensemble",
+    "EVENT_SHAPES": "events",
+    "Event": "events",
+    "EventTimeline": "events",
+    "build_events": "events",
+    "compile_events": "events",
+    "load_events": "events",
+    "IncrementalSimulation": "incremental",
+    "DEFAULT_TRANSFORMS": "ingest",
+    "HyperLogLog": "ingest",
+    "TeamTransform": "ingest",
+    "ingest_logs": "ingest",
+    "iter_log_chunks": "ingest",
+    "SimulationResult": "results",
+    "StageTimer": "profiling",
+    "profile_report": "profiling",
+    "start_profile": "profiling",
+    "root_sequence": "seeding",
+    "SCENARIO_VERSION": "scenarios",
+    "Scenario": "scenarios",
+    "ScenarioStore": "scenarios",
+    "definition_hash": "scenarios",
+    "run_scenarios": "scenarios",
+    "scenario_definition": "scenarios",
+    "scenario_deltas": "scenarios",
+    "scenario_summary": "scenarios",
+    "SimulationService": "service",
+    "serve_in_background": "service",
+    "team_generators": "seeding",
+    "team_sequence": "seeding",
+    "grid": "sweep",
+    "latin_hypercube": "sweep",
+    "run_sweep": "sweep",
+    "TEAM_REGISTRY": "teams",
+    "TeamSpec": "teams",
+    "default_team_weights": "teams",
+    "register_team": "teams",
+    "team_arrays": "teams",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
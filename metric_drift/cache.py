@@ -0,0 +1,118 @@
+"""Bounded memoization for the simulation and divergence stages.
+
+Streamlit reruns ``app.py`` top to bottom on every widget interaction, but
+modules stay imported, so a module-level cache survives reruns and is shared by
+every session in the server process.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+
+def make_key(*parts):
+    """Hashable, normalized cache key for sidebar parameters.
+
+    Floats are rounded so slider values that print the same compare the same,
+    dates become ISO strings and mappings become tuples of items (order is
+    kept, since it fixes the team column order).
+    """
+    return tuple(_normalize(p) for p in parts)
+
+
+def run_key(start_date, granularity, base_drift, context_factor, seasonality, noise_level,
+            team_weights, seed, schedule=None):
+    """Key of a simulation run without its end date, shared by the app and the HTTP service.
+
+    ``schedule`` identifies a custom event schedule (``None`` for the
+    built-in events). Append ``make_key(end_date)`` for the key of a
+    simulated range.
+    """
+    return make_key(start_date, granularity, base_drift, context_factor, seasonality, noise_level,
+                    team_weights, seed, schedule)
+
+
+def _normalize(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, float):
+        return round(value, 10)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return tuple((k, _normalize(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    return value
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with an optional time-to-live.
+
+    Entries older than ``ttl`` seconds count as misses; once more than
+    ``maxsize`` entries are held the least recently used one is evicted.
+    """
+
+    def __init__(self, maxsize=128, ttl=None, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self.ttl is not None and self._timer() - entry[0] > self.ttl:
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (self._timer(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Cached value for ``key``, calling ``compute()`` and storing its result on a miss."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """Hit/miss counters plus current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Shared by the simulation and divergence stages; keys start with the stage name
+SIMULATION_CACHE = LRUCache(maxsize=128, ttl=3600)
@@ -0,0 +1,91 @@
+"""Date axis of a simulation.
+
+Calendars are built as ``numpy.datetime64`` arrays in one vectorized step,
+together with the integer day offsets the engine works on, so even
+multi-year daily ranges cost next to nothing.
+
+Monthly and quarterly periods keep the start date's day of the month,
+clamped to the length of each month (Jan 31 -> Feb 29 -> Mar 31). Fiscal
+4-4-5 style calendars start a period every 4 or 5 weeks from the start date,
+so each quarter is 13 weeks and each fiscal year 52.
+"""
+import numpy as np
+
+# Weeks per period within a fiscal quarter
+FISCAL_PATTERNS = {
+    "Fiscal 4-4-5": (4, 4, 5),
+    "Fiscal 4-5-4": (4, 5, 4),
+    "Fiscal 5-4-4": (5, 4, 4),
+}
+
+GRANULARITIES = ["Daily", "Weekly", "Monthly", "Month End", "Quarterly"] + list(FISCAL_PATTERNS)
+
+
+def as_day_array(dates):
+    """``dates`` (date objects, strings or datetime64 values) as a ``datetime64[D]`` array."""
+    return np.asarray(dates, dtype='datetime64[D]')
+
+
+def day_offsets(dates, origin=None):
+    """Whole days from ``origin`` (default: the first date) to each date, as an int64 array."""
+    dates = as_day_array(dates)
+    if not len(dates):
+        return dates.astype(np.int64)
+    origin = dates[0] if origin is None else np.datetime64(origin, 'D')
+    return (dates - origin).astype(np.int64)
+
+
+def _month_anchored(start, end, step):
+    # Every ``step`` months from ``start``, on start's day clamped to the month length
+    first = start.astype('datetime64[M]')
+    months = np.arange(first, end.astype('datetime64[M]') + 1, step)
+    month_days = ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(np.int64)
+    day = (start - first.astype('datetime64[D]')).astype(np.int64)
+    return months.astype('datetime64[D]') + np.minimum(day, month_days - 1)
+
+
+def _month_ends(start, end):
+    months = np.arange(start.astype('datetime64[M]'), end.astype('datetime64[M]') + 1)
+    ends = (months + 1).astype('datetime64[D]') - 1
+    return ends[ends >= start]
+
+
+def _fiscal(start, end, pattern):
+    # Period starts: cumulative weeks of the repeating pattern, from the start date
+    span = (end - start).astype(np.int64)
+    if span < 0:
+        return start + np.arange(0)
+    periods = span // (7 * min(pattern)) + 1
+    weeks = np.concatenate([[0], np.cumsum(np.resize(pattern, periods))])
+    return start + weeks * 7
+
+
+def calendar_index(start_date, end_date, granularity):
+    """Dates from ``start_date`` to ``end_date`` at ``granularity`` and their day offsets.
+
+    ``granularity`` is one of ``GRANULARITIES``. Returns a ``datetime64[D]``
+    array of the dates and an int64 array of days since ``start_date``.
+    """
+    start = np.datetime64(start_date, 'D')
+    end = np.datetime64(end_date, 'D')
+    if granularity == "Daily":
+        dates = np.arange(start, end + 1)
+    elif granularity == "Weekly":
+        dates = np.arange(start, end + 1, 7)
+    elif granularity == "Monthly":
+        dates = _month_anchored(start, end, 1)
+    elif granularity == "Month End":
+        dates = _month_ends(start, end)
+    elif granularity == "Quarterly":
+        dates = _month_anchored(start, end, 3)
+    elif granularity in FISCAL_PATTERNS:
+        dates = _fiscal(start, end, FISCAL_PATTERNS[granularity])
+    else:
+        raise ValueError(f"Unknown granularity: {granularity!r}")
+    dates = dates[dates <= end]
+    return dates, (dates - start).astype(np.int64)
+
+
+def generate_dates(start_date, end_date, granularity):
+    """Simulation dates from ``start_date`` to ``end_date`` as a ``datetime64[D]`` array (see ``calendar_index``)."""
+    return calendar_index(start_date, end_date, granularity)[0]
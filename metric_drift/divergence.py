@@ -0,0 +1,112 @@
+"""Team-to-team divergence analysis on the (time x team) matrix of team metrics.
+
+Aggregates never materialize the N*(N-1)/2 team pairs: the largest pair
+difference is the row range, and the mean pair difference comes from the
+sorted row (for sorted ``x``, the sum over pairs of ``x[j] - x[i]`` is
+``sum((2k - N + 1) * x[k])``), so both cost O(T*N log N). The explicit
+pair tensor and the per-pair frames are only built for display. The frame
+functions take a results frame or a ``SimulationResult``.
+"""
+import numpy as np
+
+
+def team_columns(df):
+    """Names of the team columns of a results frame."""
+    return [col for col in df.columns if col not in ['date', 'day']]
+
+
+def _table(data):
+    # Dates, day offsets, team names and (time x team) values of a results
+    # frame or SimulationResult
+    if hasattr(data, "matrix"):
+        return data.dates, data.day, data.teams, data.matrix
+    teams = team_columns(data)
+    return data['date'].to_numpy(), data['day'].to_numpy(), teams, data[teams].to_numpy()
+
+
+def pair_labels(teams):
+    """``"{team1} vs {team2}"`` label of every team pair."""
+    return [f"{teams[i]} vs {teams[j]}" for i in range(len(teams)) for j in range(i+1, len(teams))]
+
+
+def pair_differences(values):
+    """Absolute difference of every team pair, as a (..., pair) tensor in ``pair_labels`` order."""
+    i, j = np.triu_indices(values.shape[-1], k=1)
+    return np.abs(values[..., i] - values[..., j])
+
+
+def mean_pair_difference(values):
+    """Mean absolute difference over all team pairs along the last axis of ``values``."""
+    n = values.shape[-1]
+    if n < 2:
+        return np.full(values.shape[:-1], np.nan)
+    ranks = 2 * np.arange(n) - n + 1
+    return np.sort(values, axis=-1) @ ranks / (n * (n - 1) / 2)
+
+
+def max_pair_difference(values):
+    """Largest absolute difference between any two teams along the last axis of ``values``."""
+    if values.shape[-1] < 2:
+        return np.full(values.shape[:-1], np.nan)
+    return np.ptp(values, axis=-1)
+
+
+def divergence_series(values):
+    """Mean (``avg``) and largest (``max``) pair difference at every point."""
+    return {"avg": mean_pair_difference(values), "max": max_pair_difference(values)}
+
+
+def divergence_frame(df):
+    """Wide frame: ``df`` plus the absolute difference of each team pair and their mean.
+
+    Returns the frame and the list of pair columns.
+    """
+    import pandas as pd
+
+    if hasattr(df, "to_pandas"):
+        df = df.to_pandas()
+    teams = team_columns(df)
+    pairs = pair_labels(teams)
+    values = df[teams].to_numpy()
+    analysis_df = pd.concat([df, pd.DataFrame(pair_differences(values), columns=pairs, index=df.index)], axis=1)
+    analysis_df['Avg Divergence'] = mean_pair_difference(values)
+    return analysis_df, pairs
+
+
+def divergence_chart_data(df):
+    """Long frame of pair differences for charting.
+
+    Columns: ``date``, ``day``, ``Team Comparison`` and ``Absolute Difference``;
+    built straight from the pair tensor rather than by melting the wide frame.
+    """
+    import pandas as pd
+
+    dates, day, teams, values = _table(df)
+    pairs = pair_labels(teams)
+    diffs = pair_differences(values)
+    return pd.DataFrame({
+        "date": np.tile(dates, len(pairs)),
+        "day": np.tile(day, len(pairs)),
+        "Team Comparison": np.repeat(pairs, len(day)),
+        "Absolute Difference": diffs.T.reshape(-1),
+    })
+
+
+def divergence_summary(values):
+    """Divergence statistics of the last point against the first.
+
+    ``values`` is the (time x team) matrix of team metrics. Keys:
+    ``max_divergence`` and ``max_delta`` (largest pair difference),
+    ``avg_divergence`` and ``avg_delta`` (mean pair difference) and
+    ``growth_pct`` (percent change of the mean pair difference).
+    """
+    ends = values[[0, -1]]
+    start_max, end_max = max_pair_difference(ends)
+    start_avg, end_avg = mean_pair_difference(ends)
+    return {
+        "max_divergence": end_max,
+        "max_delta": end_max - start_max,
+        "avg_divergence": end_avg,
+        "avg_delta": end_avg - start_avg,
+        "growth_pct": ((end_avg - start_avg) / start_avg * 100) if start_avg > 0 else 0,
+    }
@@ -0,0 +1,91 @@
+"""Downsampling of chart data to a fixed point budget.
+
+Charts are serialized to JSON and drawn in the browser, so long daily runs
+with many teams are thinned out before charting. The default ``minmax``
+method keeps the first and last point of each series and the lowest and
+highest point of every bucket, which preserves peaks and the jumps at event
+steps; ``lttb`` (Largest-Triangle-Three-Buckets) keeps the visually most
+significant point per bucket. Only chart data is downsampled; tables and
+exports keep full resolution.
+"""
+import numpy as np
+
+DEFAULT_MAX_POINTS = 2000
+
+
+def minmax_indices(y, max_points):
+    """Sorted indices of at most ``max_points`` points of ``y``: both ends plus each bucket's min and max."""
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    if max_points < 4:  # No room for a bucket's min and max besides the ends
+        return np.array([0, n - 1])[:max(max_points, 0)]
+    size = -(-n // max(1, (max_points - 2) // 2))  # ceil
+    buckets = -(-n // size)
+
+    # Pad to a (bucket x size) grid with values that never win the arg-reduction
+    y = np.asarray(y, dtype=float)
+    pad = buckets * size - n
+    low = np.concatenate([y, np.full(pad, np.inf)]).reshape(buckets, size)
+    high = np.concatenate([y, np.full(pad, -np.inf)]).reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    return np.unique(np.concatenate([[0, n - 1], offsets + low.argmin(axis=1), offsets + high.argmax(axis=1)]))
+
+
+def lttb_indices(x, y, max_points):
+    """Sorted indices of ``max_points`` points of ``(x, y)`` chosen by Largest-Triangle-Three-Buckets."""
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return np.arange(n) if n <= max_points else np.array([0, n - 1])
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Interior points split into max_points - 2 buckets; the ends are always kept
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for b in range(max_points - 2):
+        start, stop = edges[b], edges[b + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        next_stop = edges[b + 2] if b + 2 < len(edges) else n
+        avg_x = x[stop:next_stop].mean() if next_stop > stop else x[-1]
+        avg_y = y[stop:next_stop].mean() if next_stop > stop else y[-1]
+        area = np.abs((x[previous] - avg_x) * (y[start:stop] - y[previous])
+                      - (x[previous] - x[start:stop]) * (avg_y - y[previous]))
+        previous = start + int(area.argmax())
+        selected[b + 1] = previous
+    return selected
+
+
+def downsample_indices(x, y, max_points, method="minmax"):
+    """Indices selected by ``method`` (``"minmax"`` or ``"lttb"``)."""
+    if method == "minmax":
+        return minmax_indices(y, max_points)
+    if method == "lttb":
+        return lttb_indices(x, y, max_points)
+    raise ValueError(f"Unknown downsampling method: {method!r}")
+
+
+def downsample_long(df, series, y, max_points=DEFAULT_MAX_POINTS, method="minmax", x="day"):
+    """Rows of a long chart frame thinned to about ``max_points`` in total.
+
+    ``series`` names the column identifying each line and ``y`` the value
+    column, or a list of columns (e.g. band edges) whose selected points are
+    all kept. The budget is split evenly across series; rows must be in ``x``
+    order within each series.
+    """
+    columns = [y] if isinstance(y, str) else list(y)
+    groups = df.groupby(series, sort=False).indices
+    if len(df) <= max_points or not groups:
+        return df
+    # At least both ends and one min and max per series
+    per_series = max(4, max_points // (len(groups) * len(columns)))
+
+    xs = df[x].to_numpy()
+    ys = [df[col].to_numpy() for col in columns]
+    keep = []
+    for positions in groups.values():
+        chosen = [downsample_indices(xs[positions], values[positions], per_series, method) for values in ys]
+        keep.append(positions[np.unique(np.concatenate(chosen))])
+    return df.iloc[np.sort(np.concatenate(keep))]
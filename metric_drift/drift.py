@@ -0,0 +1,152 @@
+"""Drift detection on the (time x team) matrix of team metrics.
+
+Rolling means and standard deviations are O(T) in the number of periods
+(times the team count), from cumulative sums of the series and its squares.
+Both change-point tests are Lindley processes ``S[t] = max(0, S[t-1] +
+inc[t])``, which is the cumulative sum of the increments minus its running
+minimum, so one pass needs no per-period loop; as each alarm restarts the
+test on the remaining periods, finding up to ``max_changes`` change points
+is O(T * max_changes) in the worst case.
+
+``detect_drift`` watches the average pair difference of the teams (see
+``divergence``), standardized by its level and spread over the first
+``window`` periods:
+
+* CUSUM accumulates how far it runs above that baseline, less an allowance
+  of ``drift`` standard deviations;
+* Page-Hinkley accumulates how far it runs above its own running mean, less
+  ``drift`` standard deviations.
+
+An alarm is raised when the sum exceeds ``threshold`` standard deviations;
+the change point is where the sum last left zero. After an alarm the test
+restarts with a baseline taken from the periods that follow. Independently,
+the teams are flagged as diverged where their rolling relative spread
+(largest pair difference over the mean team value) exceeds ``tolerance``.
+"""
+import numpy as np
+
+from .divergence import mean_pair_difference
+
+CHANGE_POINT_METHODS = ("cusum", "page-hinkley")
+
+
+def rolling_stats(x, window):
+    """Trailing rolling mean and sample standard deviation along the first axis of ``x``.
+
+    The first ``window - 1`` periods use the periods available so far; the
+    standard deviation of a single period is NaN.
+    """
+    x = np.asarray(x, dtype=float)
+    n_periods = len(x)
+    if not n_periods:
+        return x.copy(), x.copy()
+    # Centering on the first period keeps the sums of squares well conditioned
+    centered = x - x[0]
+    zero = np.zeros((1,) + x.shape[1:])
+    sums = np.concatenate([zero, np.cumsum(centered, axis=0)])
+    squares = np.concatenate([zero, np.cumsum(centered * centered, axis=0)])
+    stop = np.arange(1, n_periods + 1)
+    start = np.maximum(stop - window, 0)
+    count = (stop - start).reshape((-1,) + (1,) * (x.ndim - 1)).astype(float)
+    total = sums[stop] - sums[start]
+    mean = total / count
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = np.maximum(squares[stop] - squares[start] - total * mean, 0) / (count - 1)
+    var = np.where(count > 1, var, np.nan)
+    return mean + x[0], np.sqrt(var)
+
+
+def rolling_zscore(x, window):
+    """z-score of every period against the ``window`` periods before it (NaN where undefined)."""
+    x = np.asarray(x, dtype=float)
+    mean, std = rolling_stats(x, window)
+    z = np.full_like(x, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z[1:] = (x[1:] - mean[:-1]) / std[:-1]
+    z[~np.isfinite(z)] = np.nan
+    return z
+
+
+def _lindley(increments):
+    # S[t] = max(0, S[t-1] + increments[t]) with S[-1] = 0, in closed form
+    total = np.cumsum(increments)
+    return total - np.minimum(np.minimum.accumulate(total), 0)
+
+
+def change_points(x, window, method="cusum", threshold=5.0, drift=0.5, max_changes=10):
+    """Upward change points of the series ``x``.
+
+    Returns a list of ``(start, alarm)`` index pairs: the alarm is the first
+    period whose statistic exceeds ``threshold`` baseline standard
+    deviations, the start the period after it last was zero.
+    """
+    if method not in CHANGE_POINT_METHODS:
+        raise ValueError(f"Unknown change-point method: {method!r}")
+    x = np.asarray(x, dtype=float)
+    found = []
+    position = 0
+    while len(found) < max_changes and len(x) - position > window:
+        baseline = x[position:position + window]
+        level = baseline.mean()
+        spread = baseline.std(ddof=1) if window > 1 else 0.0
+        # A noise-free baseline still needs a finite scale
+        scale = max(spread, 1e-9 * max(abs(level), 1.0))
+        series = x[position:]
+        if method == "cusum":
+            increments = (series[window:] - level) / scale - drift
+        else:
+            running_mean = np.cumsum(series) / np.arange(1, len(series) + 1)
+            increments = ((series - running_mean) / scale - drift)[window:]
+        statistic = _lindley(increments)
+        alarms = np.flatnonzero(statistic > threshold)
+        if not len(alarms):
+            break
+        alarm = alarms[0]
+        zeros = np.flatnonzero(statistic[:alarm] <= 0)
+        start = zeros[-1] + 1 if len(zeros) else 0
+        offset = position + window
+        found.append((offset + start, offset + alarm))
+        position = offset + alarm + 1
+    return found
+
+
+def _runs(flags):
+    # (start, stop) index pairs of the runs of True in ``flags``
+    edges = np.diff(np.concatenate([[0], flags.astype(np.int8), [0]]))
+    return list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+
+
+def detect_drift(values, window=30, tolerance=0.25, method="cusum", threshold=5.0, drift=0.5,
+                 max_changes=10):
+    """Rolling divergence statistics, change points and tolerance breaches of a run.
+
+    ``values`` is the (time x team) matrix of at least two teams. Returns a
+    dict with the per-period arrays ``divergence`` (average pair difference),
+    ``rolling_mean``, ``rolling_std``, ``zscore``, ``relative_spread``
+    (rolling mean of the largest pair difference over the mean team value)
+    and ``exceeds`` (``relative_spread > tolerance``), plus ``change_points``
+    (``(start, alarm)`` index pairs, see ``change_points``) and
+    ``breaches`` (``(start, stop)`` index ranges where ``exceeds`` holds).
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 2 or values.shape[1] < 2:
+        raise ValueError("Drift detection needs a (time x team) matrix of at least two teams")
+    divergence = mean_pair_difference(values)
+    rolling_mean, rolling_std = rolling_stats(divergence, window)
+
+    level = values.mean(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        spread = np.where(level > 0, np.ptp(values, axis=1) / level, np.nan)
+    relative_spread = rolling_stats(np.nan_to_num(spread), window)[0]
+    exceeds = relative_spread > tolerance
+
+    return {
+        "divergence": divergence,
+        "rolling_mean": rolling_mean,
+        "rolling_std": rolling_std,
+        "zscore": rolling_zscore(divergence, window),
+        "relative_spread": relative_spread,
+        "exceeds": exceeds,
+        "change_points": change_points(divergence, window, method, threshold, drift, max_changes),
+        "breaches": _runs(exceeds),
+    }
@@ -0,0 +1,209 @@
+"""Metric drift simulation engine.
+
+``simulate`` computes every team series as whole-array NumPy operations into
+a columnar ``SimulationResult``; ``simulate_metric_drift`` returns it as a
+frame. ``simulate_metric_drift_reference`` is the original per-point loop,
+kept as the reference the vectorized engine is checked against: for the same
+seed and the Finance, Product and Marketing teams at the same weights, both
+return the same frame. Noise comes from per-team streams (see ``seeding``), so
+a run is fully determined by its parameters and seed.
+"""
+import numpy as np
+
+from .calendar import as_day_array, day_offsets
+from .events import build_events, compile_events
+from .results import SimulationResult
+from .seeding import team_generators
+from .teams import team_arrays
+
+
+def base_metric(t, seasonality):
+    """Common starting point for every team; ``t`` may be a scalar or an array of day offsets."""
+    # Base value with some growth
+    base = 100 + 0.05 * t
+    # Add seasonality (if enabled)
+    if seasonality > 0:
+        # Yearly seasonality pattern
+        yearly_cycle = np.sin(2 * np.pi * t / 365) * 10 * seasonality
+        # Weekly seasonality pattern (for higher frequency data)
+        weekly_cycle = np.sin(2 * np.pi * t / 7) * 5 * seasonality
+        base = base + yearly_cycle + weekly_cycle
+    return base
+
+
+def simulation_terms(dates, base_drift, context_factor, seasonality, noise_level,
+                     team_weights, registry=None, origin=None, events=None):
+    """Noise-free part of a simulation.
+
+    Day offsets are counted from ``origin`` (default: the first date).
+    ``events`` is a list of ``Event`` or an ``EventTimeline`` and defaults to
+    ``build_events`` over the offsets; both can be given to evaluate a later
+    slice of a longer run. Returns a dict with the integer day offsets ``t``,
+    the list of ``events``, the (time x team) ``mean`` value before noise and
+    the (time x team) noise ``scale``; a team's value is
+    ``max(0, mean + scale * N(0, 1))``.
+    """
+    teams = list(team_weights)
+    p = team_arrays(team_weights, registry)
+
+    # Day offsets as one integer array
+    t = day_offsets(dates, origin)
+    if events is None:
+        events = build_events(int(t[-1]) if len(t) else 0)
+    timeline = compile_events(events)
+
+    base_value = base_metric(t, seasonality)[:, None]
+    weight = p["weight"]
+
+    # Progressive drift plus event steps, as a (time x team) matrix
+    drift = base_drift * t[:, None] * (p["drift_rate"] * weight)
+    drift = drift + timeline.contributions(teams, t) * (p["event_step"] * context_factor * weight)
+
+    return {
+        "t": t,
+        "events": timeline.events,
+        "mean": base_value * (1 + p["level"] * context_factor * weight) + p["drift_sign"] * drift,
+        "scale": base_value * noise_level * p["noise_scale"],
+    }
+
+
+def _draw_values(terms, teams, rngs, dtype=np.float64):
+    # (team x time) values, one team row at a time from its own stream, so
+    # the only temporary is a single series
+    mean, scale = terms["mean"], terms["scale"]
+    values = np.empty((len(teams), len(terms["t"])), dtype=dtype)
+    for k, team in enumerate(teams):
+        row = rngs[team].standard_normal(len(terms["t"]))
+        row *= scale[:, k]
+        row += mean[:, k]
+        np.maximum(row, 0, out=values[k])  # Ensure non-negative
+    return values
+
+
+def simulate_matrix(dates, base_drift, context_factor, seasonality, noise_level,
+                    team_weights, seed=None, registry=None, dtype=np.float64, events=None):
+    """(time x team) values of a simulation without building a frame.
+
+    Returns the values (a view of a team-major array of ``dtype``) and the
+    ``simulation_terms`` they were drawn around.
+    """
+    teams = list(team_weights)
+    terms = simulation_terms(dates, base_drift, context_factor, seasonality, noise_level,
+                             team_weights, registry, events=events)
+    values = _draw_values(terms, teams, team_generators(seed, teams), dtype)
+    return values.T, terms
+
+
+def simulate(dates, base_drift, context_factor, seasonality, noise_level,
+             team_weights, seed=None, registry=None, dtype=np.float64, events=None):
+    """Simulation as a ``SimulationResult``, with values stored as ``dtype``.
+
+    Parameters are those of ``simulate_metric_drift``; a float32 result holds
+    the float64 values rounded to single precision.
+    """
+    values, terms = simulate_matrix(dates, base_drift, context_factor, seasonality, noise_level,
+                                    team_weights, seed, registry, dtype, events)
+    return SimulationResult.from_matrix(as_day_array(dates), terms["t"], values, list(team_weights),
+                                        terms["events"])
+
+
+def simulate_metric_drift(dates, base_drift, context_factor, seasonality, noise_level,
+                          team_weights, seed=None, registry=None, events=None):
+    """Vectorized simulation of one metric as seen by each team.
+
+    ``team_weights`` maps the name of each simulated team to its context
+    weight; the teams' coefficients come from ``registry`` (the default team
+    registry if omitted). ``seed`` is an int or ``SeedSequence`` (``None`` for
+    a non-reproducible run). ``events`` is the event schedule (see
+    ``simulation_terms``). Returns the results frame, with one column per
+    team, and the list of events.
+    """
+    result = simulate(dates, base_drift, context_factor, seasonality, noise_level,
+                      team_weights, seed, registry, events=events)
+    return result.to_pandas(), result.events
+
+
+def simulate_metric_drift_reference(dates, base_drift, context_factor, seasonality, noise_level,
+                                    finance_mod, product_mod, marketing_mod,
+                                    include_finance=True, include_product=True,
+                                    include_marketing=True, seed=None):
+    """Original point-by-point implementation of ``simulate_metric_drift``.
+
+    ``dates`` is a sequence of date objects or a ``datetime64`` array (as
+    ``generate_dates`` returns).
+    """
+    import pandas as pd
+
+    rngs = team_generators(seed, ["Finance", "Product", "Marketing"])
+
+    # Convert dates to numeric for calculations
+    date_nums = day_offsets(dates).tolist()
+    max_days = date_nums[-1] if date_nums else 0
+
+    # Generate data for each team
+    results = []
+
+    # Key events that cause definition changes
+    events = build_events(max_days)
+
+    for i, d in enumerate(dates):
+        t = date_nums[i]
+        point = {"date": d, "day": t}
+
+        # Calculate base value
+        base_value = base_metric(t, seasonality)
+
+        # Add team-specific transformations
+
+        # Finance team (tends to be conservative, focuses on recognized revenue)
+        if include_finance:
+            # Progressive drift based on finance-specific context
+            finance_drift = base_drift * t * 0.15 * finance_mod
+            # Step changes at specific events
+            for event in events:
+                if t >= event.day and "Finance" in event.description:
+                    finance_drift += 5 * context_factor * finance_mod
+
+            # Add noise
+            finance_noise = rngs['Finance'].normal(0, base_value * noise_level * 0.5)
+
+            # Final finance metric value
+            finance_value = base_value * (1 + 0.1 * context_factor * finance_mod) - finance_drift + finance_noise
+            point["Finance"] = max(0, finance_value)  # Ensure non-negative
+
+        # Product team (focuses on user engagement and product usage)
+        if include_product:
+            # Progressive drift based on product-specific context
+            product_drift = base_drift * t * 0.2 * product_mod
+            # Step changes at specific events
+            for event in events:
+                if t >= event.day and "Product" in event.description:
+                    product_drift -= 8 * context_factor * product_mod  # Product team filters out data
+
+            # Add noise
+            product_noise = rngs['Product'].normal(0, base_value * noise_level * 0.7)
+
+            # Final product metric value
+            product_value = base_value * (1 - 0.05 * context_factor * product_mod) - product_drift + product_noise
+            point["Product"] = max(0, product_value)  # Ensure non-negative
+
+        # Marketing team (focuses on attribution and campaign performance)
+        if include_marketing:
+            # Progressive drift based on marketing-specific context
+            marketing_drift = base_drift * t * 0.25 * marketing_mod
+            # Step changes at specific events
+            for event in events:
+                if t >= event.day and "Marketing" in event.description:
+                    marketing_drift += 12 * context_factor * marketing_mod  # Marketing changes attribution
+
+            # Add noise
+            marketing_noise = rngs['Marketing'].normal(0, base_value * noise_level)
+
+            # Final marketing metric value
+            marketing_value = base_value * (1 + 0.15 * context_factor * marketing_mod) + marketing_drift + marketing_noise
+            point["Marketing"] = max(0, marketing_value)  # Ensure non-negative
+
+        # Add the data point
+        results.append(point)
+
+    return pd.DataFrame(results), events
@@ -0,0 +1,88 @@
+"""Monte Carlo ensembles of the metric drift simulation.
+
+Instead of one noisy trajectory per team, an ensemble draws ``replicates``
+trajectories and summarizes them as percentile bands. All replicates are
+computed together as a (time x replicate x team) array; the timeline is
+processed in slabs small enough to keep that array within a fixed element
+budget, so memory stays bounded however many replicates are requested and
+the percentiles are still exact.
+"""
+import numpy as np
+
+from .calendar import as_day_array
+from .divergence import mean_pair_difference
+from .engine import simulation_terms
+from .seeding import team_generators
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Upper bound on the elements of the per-slab (time x replicate x team) array
+MAX_CHUNK_ELEMENTS = 2 ** 22
+
+AVG_DIVERGENCE = "Avg Divergence"
+
+
+def band_columns(percentiles=DEFAULT_PERCENTILES):
+    """Column names of the percentile bands, e.g. ``p5`` and ``p95``."""
+    return [f"p{q:g}" for q in percentiles]
+
+
+def iter_ensemble_bands(dates, base_drift, context_factor, seasonality, noise_level,
+                        team_weights, replicates=1000, seed=None,
+                        percentiles=DEFAULT_PERCENTILES, max_chunk_elements=MAX_CHUNK_ELEMENTS,
+                        registry=None, events=None):
+    """Yield the percentile bands of an ensemble one slab of the timeline at a time.
+
+    Each chunk is a long frame with ``date``, ``day``, ``series`` (a team name
+    or ``"Avg Divergence"`` when at least two teams are simulated) and one
+    column per percentile. Every team draws its replicates from its own seeded
+    stream in time order, so results do not depend on the slab size.
+    """
+    import pandas as pd
+
+    dates = as_day_array(dates).astype('datetime64[ns]')
+    teams = list(team_weights)
+    terms = simulation_terms(dates, base_drift, context_factor, seasonality, noise_level,
+                             team_weights, registry, events=events)
+    t = terms["t"]
+    rngs = team_generators(seed, teams)
+    series = teams + ([AVG_DIVERGENCE] if len(teams) >= 2 else [])
+    columns = band_columns(percentiles)
+
+    # Pair differences need room too, hence the extra factor over the team count
+    width = max(1, replicates * len(teams) * max(1, len(teams) - 1))
+    step = max(1, max_chunk_elements // width)
+
+    for start in range(0, len(t), step):
+        stop = min(start + step, len(t))
+        z = np.empty((stop - start, replicates, len(teams)))
+        for k, team in enumerate(teams):
+            z[:, :, k] = rngs[team].standard_normal((stop - start, replicates))
+        values = np.maximum(0, terms["mean"][start:stop, None, :] + terms["scale"][start:stop, None, :] * z)
+        if len(teams) >= 2:
+            values = np.concatenate([values, mean_pair_difference(values)[..., None]], axis=-1)
+
+        # (percentile x time x series) -> one row per (time, series)
+        bands = np.percentile(values, percentiles, axis=1)
+        chunk = pd.DataFrame({
+            "date": np.repeat(dates[start:stop], len(series)),
+            "day": np.repeat(t[start:stop], len(series)),
+            "series": np.tile(series, stop - start),
+        })
+        for name, band in zip(columns, bands):
+            chunk[name] = band.reshape(-1)
+        yield chunk
+
+
+def ensemble_bands(dates, base_drift, context_factor, seasonality, noise_level,
+                   team_weights, replicates=1000, seed=None, percentiles=DEFAULT_PERCENTILES,
+                   max_chunk_elements=MAX_CHUNK_ELEMENTS, registry=None, events=None):
+    """Percentile bands of the whole ensemble as one frame (see ``iter_ensemble_bands``)."""
+    import pandas as pd
+
+    chunks = list(iter_ensemble_bands(dates, base_drift, context_factor, seasonality, noise_level,
+                                      team_weights, replicates, seed, percentiles,
+                                      max_chunk_elements, registry, events))
+    if not chunks:
+        return pd.DataFrame(columns=["date", "day", "series"] + band_columns(percentiles))
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,207 @@
+"""Event timelines: definition changes that shift a team's metric.
+
+An ``Event`` belongs to one team and starts on a day offset from the start
+of the run. Its effect rises to ``magnitude`` (in units of the team's
+``event_step``, see ``TeamSpec``) either at once (``"step"``) or linearly
+over ``ramp_days`` (``"ramp"``), and with a ``half_life`` decays
+exponentially once fully in effect.
+
+``EventTimeline`` precompiles a schedule into sorted per-team arrays:
+cumulative sums for steps and ramps (a sum of ramps is piecewise linear, so
+it is a cumulative slope times ``t`` minus a cumulative intercept) and, for
+decaying events, the decayed total at every event so the total at any later
+day is one power of two away. Evaluating a team over the whole timeline is
+then a ``searchsorted`` per array, however many events there are.
+
+Schedules are loaded from JSON or CSV files with ``load_events``.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass, fields
+from typing import Optional
+
+import numpy as np
+
+EVENT_SHAPES = ("step", "ramp")
+
+
+@dataclass(frozen=True)
+class Event:
+    """A change to one team's metric definition, starting on ``day``."""
+    team: str
+    day: int
+    description: str = ""
+    shape: str = "step"
+    magnitude: float = 1.0
+    ramp_days: float = 0.0
+    half_life: Optional[float] = None
+
+    def __post_init__(self):
+        if self.shape not in EVENT_SHAPES:
+            raise ValueError(f"Unknown event shape: {self.shape!r}")
+        if self.shape == "ramp" and not self.ramp_days > 0:
+            raise ValueError(f"A ramp event needs ramp_days > 0, got {self.ramp_days!r}")
+        if self.half_life is not None and not self.half_life > 0:
+            raise ValueError(f"half_life must be positive, got {self.half_life!r}")
+
+    @property
+    def full_day(self):
+        """Day from which the event is fully in effect."""
+        return self.day + (self.ramp_days if self.shape == "ramp" else 0)
+
+
+def build_events(max_days):
+    """Key events that cause definition changes, scaled to the simulated range."""
+    events = []
+    if max_days >= 30:
+        events.append(Event("Finance", min(30, max_days // 3),
+                            "Finance team adds attribution window adjustment"))
+    if max_days >= 60:
+        events.append(Event("Product", min(60, max_days // 2),
+                            "Product team filters out test accounts"))
+    if max_days >= 90:
+        events.append(Event("Marketing", min(90, max_days * 2 // 3),
+                            "Marketing team changes channel grouping logic"))
+    return events
+
+
+def _cumulative(x, weights):
+    # Sorted ``x`` and the running sums of ``weights`` in that order, with a
+    # leading 0 so ``sums[searchsorted(x, t, 'right')]`` is the sum up to ``t``
+    order = np.argsort(x, kind='stable')
+    return x[order], np.concatenate([[0.0], np.cumsum(weights[order])])
+
+
+class _TeamTimeline:
+    """One team's events compiled into cumulative arrays."""
+
+    def __init__(self, events):
+        day = np.array([e.day for e in events], dtype=float)
+        full = np.array([e.full_day for e in events], dtype=float)
+        magnitude = np.array([e.magnitude for e in events], dtype=float)
+        ramp = full > day
+        decays = np.array([e.half_life is not None for e in events], dtype=bool)
+
+        # Steps, plus the removal of every decaying event's full effect (its
+        # decayed remainder is added separately)
+        steps = ~ramp
+        self.steps = _cumulative(np.concatenate([day[steps], full[decays]]),
+                                 np.concatenate([magnitude[steps], -magnitude[decays]]))
+
+        # Ramps: slope m / r from ``day`` until ``full``
+        slope = magnitude[ramp] / (full[ramp] - day[ramp])
+        self.ramps = None
+        if ramp.any():
+            starts, start_slope = _cumulative(day[ramp], slope)
+            _, start_intercept = _cumulative(day[ramp], slope * day[ramp])
+            ends, end_slope = _cumulative(full[ramp], slope)
+            _, end_intercept = _cumulative(full[ramp], slope * full[ramp])
+            self.ramps = (starts, start_slope, start_intercept, ends, end_slope, end_intercept)
+
+        # Decays, grouped by half-life: total decayed effect at each event's
+        # full day, so later totals are ``total * 2 ** (-(t - full) / h)``
+        self.decays = []
+        half_lives = np.array([e.half_life for e in events if e.half_life is not None], dtype=float)
+        for h in np.unique(half_lives):
+            group = np.array([e.half_life == h for e in events]) & decays
+            order = np.argsort(full[group], kind='stable')
+            at, m = full[group][order], magnitude[group][order]
+            totals = np.empty(len(at))
+            total = 0.0
+            for k in range(len(at)):
+                if k:
+                    total *= 2.0 ** (-(at[k] - at[k - 1]) / h)
+                total += m[k]
+                totals[k] = total
+            self.decays.append((h, at, totals))
+
+    def evaluate(self, t):
+        days, sums = self.steps
+        value = sums[np.searchsorted(days, t, side='right')]
+        if self.ramps is not None:
+            starts, start_slope, start_intercept, ends, end_slope, end_intercept = self.ramps
+            i = np.searchsorted(starts, t, side='right')
+            j = np.searchsorted(ends, t, side='right')
+            value = value + (t * start_slope[i] - start_intercept[i]) - (t * end_slope[j] - end_intercept[j])
+        for h, at, totals in self.decays:
+            k = np.searchsorted(at, t, side='right') - 1
+            last = np.maximum(k, 0)
+            value = value + np.where(k >= 0, totals[last] * 2.0 ** (-(t - at[last]) / h), 0.0)
+        return value
+
+
+class EventTimeline:
+    """A schedule of events compiled for vectorized evaluation."""
+
+    def __init__(self, events=()):
+        self.events = sorted(events, key=lambda e: (e.day, e.team))
+        by_team = {}
+        for event in self.events:
+            by_team.setdefault(event.team, []).append(event)
+        self._teams = {team: _TeamTimeline(team_events) for team, team_events in by_team.items()}
+
+    def __len__(self):
+        return len(self.events)
+
+    def contributions(self, teams, t):
+        """(time x team) effect of the events in force at each day offset in ``t``.
+
+        Effects are in units of each team's ``event_step``; a team without
+        events gets zeros.
+        """
+        t = np.asarray(t, dtype=float)
+        out = np.zeros((len(t), len(teams)))
+        for k, team in enumerate(teams):
+            if team in self._teams:
+                out[:, k] = self._teams[team].evaluate(t)
+        return out
+
+
+def compile_events(events):
+    """``events`` as an ``EventTimeline`` (returned as is if it already is one)."""
+    return events if isinstance(events, EventTimeline) else EventTimeline(events)
+
+
+def _event_from_record(record):
+    names = {f.name for f in fields(Event)}
+    unknown = set(record) - names
+    if unknown:
+        raise ValueError(f"Unknown event fields: {', '.join(sorted(unknown))}")
+    # Empty CSV cells fall back to the defaults
+    values = {name: value for name, value in record.items() if value not in ("", None)}
+    for name in ("team", "day"):
+        if name not in values:
+            raise ValueError(f"Event is missing {name!r}: {record!r}")
+    values["day"] = int(values["day"])
+    for name in ("magnitude", "ramp_days", "half_life"):
+        if name in values:
+            values[name] = float(values[name])
+    return Event(**values)
+
+
+def load_events(source):
+    """Events from a JSON or CSV schedule.
+
+    ``source`` is a path or a text or binary file object. JSON holds a list of
+    event objects (or ``{"events": [...]}``), CSV has a header row; either way
+    the fields are those of ``Event``, of which ``team`` and ``day`` are
+    required.
+    """
+    if hasattr(source, "read"):
+        text = source.read()
+        name = str(getattr(source, "name", ""))
+    else:
+        with open(source, encoding="utf-8") as f:
+            text = f.read()
+        name = str(source)
+    if isinstance(text, bytes):
+        text = text.decode("utf-8")
+
+    if name.endswith(".json") or text.lstrip()[:1] in ("[", "{"):
+        records = json.loads(text)
+        if isinstance(records, dict):
+            records = records.get("events", [])
+    else:
+        records = list(csv.DictReader(io.StringIO(text)))
+    return [_event_from_record(record) for record in records]
@@ -0,0 +1,64 @@
+"""Chunked export of simulation results to CSV and Parquet.
+
+Exports are written a slice of rows at a time, so a large frame is never
+rendered into one giant string; ``iter_csv_chunks`` can also feed a
+streaming response directly. Parquet needs pyarrow, which is imported only
+when a Parquet export is requested. Every function takes a frame or a
+``SimulationResult``; a result is written to Parquet straight from its arrays.
+"""
+import io
+
+DEFAULT_CHUNK_ROWS = 50_000
+
+# Format name -> (MIME type, file extension)
+EXPORT_FORMATS = {
+    "CSV": ("text/csv", ".csv"),
+    "Parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+
+def iter_csv_chunks(df, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield ``df`` as UTF-8 CSV bytes, header first, ``chunk_rows`` rows at a time."""
+    if hasattr(df, "to_pandas"):
+        df = df.to_pandas()
+    yield df.iloc[:0].to_csv(index=False).encode()
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=False).encode()
+
+
+def write_csv(df, fileobj, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Stream ``df`` as CSV into the binary file object ``fileobj``."""
+    for chunk in iter_csv_chunks(df, chunk_rows):
+        fileobj.write(chunk)
+
+
+def write_parquet(df, fileobj, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Stream ``df`` as Parquet into ``fileobj``, one row group per ``chunk_rows`` rows."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if hasattr(df, "to_arrow"):
+        table = df.to_arrow()
+        with pq.ParquetWriter(fileobj, table.schema) as writer:
+            writer.write_table(table, row_group_size=chunk_rows)
+        return
+
+    # The first chunk fixes the schema (an empty frame cannot type object columns)
+    first = pa.Table.from_pandas(df.iloc[:chunk_rows], preserve_index=False)
+    with pq.ParquetWriter(fileobj, first.schema) as writer:
+        writer.write_table(first)
+        for start in range(chunk_rows, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=first.schema, preserve_index=False))
+
+
+def export_bytes(df, fmt="CSV", chunk_rows=DEFAULT_CHUNK_ROWS):
+    """``df`` exported in ``fmt`` (a key of ``EXPORT_FORMATS``) as bytes."""
+    buffer = io.BytesIO()
+    if fmt == "CSV":
+        write_csv(df, buffer, chunk_rows)
+    elif fmt == "Parquet":
+        write_parquet(df, buffer, chunk_rows)
+    else:
+        raise ValueError(f"Unknown export format: {fmt!r}")
+    return buffer.getvalue()
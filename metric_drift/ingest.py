@@ -0,0 +1,228 @@
+"""Ingestion of raw event logs into per-team metric series.
+
+This is the Python counterpart of the team pipelines in
+``src/data/pipelines.ts``: each team keeps the log rows that pass its filter
+and counts distinct users per calendar period. Event files (CSV, or Parquet
+read through a memory map) are processed in one pass, chunk by chunk, with
+every team's filter evaluated on the same chunk, whose users are encoded
+once for all teams. Distinct users are counted either exactly, by reducing
+each chunk to unique integer (period, user) keys, or approximately with one
+HyperLogLog sketch per team and period, which has fixed memory whatever the
+number of users.
+
+The result is a ``SimulationResult`` like a simulation's, so it feeds
+straight into the divergence analysis, charts and export.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from .calendar import calendar_index
+from .results import SimulationResult
+
+DEFAULT_CHUNK_ROWS = 500_000
+HLL_PRECISION = 12
+
+
+@dataclass(frozen=True)
+class TeamTransform:
+    """Row filter of one team's pipeline: ``column op value``.
+
+    ``op`` is ``"in"`` (``value`` is a collection), ``">"``, ``">="``,
+    ``"<"``, ``"<="``, ``"=="`` or ``"!="``.
+    """
+    team: str
+    column: str
+    op: str
+    value: object
+
+    def mask(self, chunk):
+        """Boolean array of the rows of ``chunk`` kept by this filter."""
+        values = chunk[self.column]
+        if self.op == "in":
+            return values.isin(list(self.value)).to_numpy()
+        ops = {">": values.gt, ">=": values.ge, "<": values.lt, "<=": values.le,
+               "==": values.eq, "!=": values.ne}
+        if self.op not in ops:
+            raise ValueError(f"Unknown filter operator: {self.op!r}")
+        return ops[self.op](self.value).fillna(False).to_numpy(dtype=bool)
+
+
+# The transforms of src/data/pipelines.ts
+DEFAULT_TRANSFORMS = {
+    "Product": TeamTransform("Product", "event_type", "in", ("feature_use",)),
+    "Finance": TeamTransform("Finance", "charge_amount", ">", 0),
+    "Marketing": TeamTransform("Marketing", "event_type", "in", ("click", "open")),
+}
+
+
+class ExactDistinct:
+    """Exact distinct users per row (team x period) from unique integer keys.
+
+    Users get dense global integer ids from an index of every user seen so
+    far, extended once per chunk, so a chunk's keys are built with array
+    operations only.
+    """
+
+    # Re-deduplicate the collected keys once they exceed this many
+    COMPACT_KEYS = 20_000_000
+
+    def __init__(self, rows):
+        import pandas as pd
+
+        self.rows = rows
+        self._users = pd.Index([])
+        self._keys = []
+        self._pending = 0
+
+    def encode(self, uniques):
+        """Global integer id of each of a chunk's distinct users."""
+        import pandas as pd
+
+        ids = self._users.get_indexer(uniques)
+        new = ids < 0
+        if new.any():
+            ids[new] = len(self._users) + np.arange(int(new.sum()))
+            self._users = self._users.append(pd.Index(uniques[new]))
+        return ids.astype(np.int64)
+
+    def add(self, rows, codes):
+        """Count users with ids ``codes`` (from ``encode``) in ``rows``."""
+        keys = np.unique((rows.astype(np.int64) << 32) | codes)
+        self._keys.append(keys)
+        self._pending += len(keys)
+        if self._pending > self.COMPACT_KEYS:
+            self._keys = [np.unique(np.concatenate(self._keys))]
+            self._pending = len(self._keys[0])
+
+    def counts(self):
+        if not self._keys:
+            return np.zeros(self.rows)
+        keys = np.unique(np.concatenate(self._keys))
+        return np.bincount(keys >> 32, minlength=self.rows).astype(float)
+
+
+class HyperLogLog:
+    """One HyperLogLog sketch of ``2**precision`` registers per row (team x period).
+
+    The relative error is about ``1.04 / sqrt(2**precision)`` (1.6% at the
+    default precision of 12).
+    """
+
+    def __init__(self, rows, precision=HLL_PRECISION):
+        self.rows = rows
+        self.precision = precision
+        self.registers = np.zeros((rows, 2 ** precision), dtype=np.uint8)
+
+    def encode(self, uniques):
+        """64-bit hash of each of a chunk's distinct users."""
+        import pandas as pd
+
+        return pd.util.hash_array(np.asarray(uniques, dtype=object))
+
+    def add(self, rows, hashes):
+        """Count users with ``hashes`` (from ``encode``) in ``rows``."""
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - p)) - 1)
+        # Position of the leftmost 1-bit in the remaining 64 - p bits; frexp's
+        # exponent is the bit length, exact once split into 32-bit halves
+        high = (rest >> np.uint64(32)).astype(np.float64)
+        low = (rest & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        bit_length = np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+        rank = (64 - p - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, (rows, index), rank)
+
+    def counts(self):
+        m = self.registers.shape[1]
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.exp2(-self.registers.astype(np.float64)).sum(axis=1)
+        # Small-range correction (linear counting)
+        zeros = (self.registers == 0).sum(axis=1)
+        small = (estimate <= 2.5 * m) & (zeros > 0)
+        estimate[small] = m * np.log(m / zeros[small])
+        return estimate
+
+
+def iter_log_chunks(source, columns=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield DataFrame chunks of an event log.
+
+    ``source`` is a path or file object of a CSV or Parquet file (Parquet is
+    recognized by its ``.parquet`` suffix or ``PAR1`` magic bytes and read
+    through a memory map when it is a path), or a DataFrame.
+    """
+    import pandas as pd
+
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_rows):
+            yield source.iloc[start:start + chunk_rows]
+        return
+
+    name = getattr(source, "name", source)
+    if hasattr(source, "read"):
+        is_parquet = source.read(4) == b"PAR1"
+        source.seek(0)
+    else:
+        is_parquet = str(name).endswith(".parquet")
+
+    if is_parquet:
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(source, memory_map=not hasattr(source, "read"))
+        available = parquet.schema_arrow.names
+        wanted = None if columns is None else [c for c in columns if c in available]
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=wanted):
+            yield batch.to_pandas()
+    else:
+        usecols = None if columns is None else (lambda c: c in columns)
+        yield from pd.read_csv(source, usecols=usecols, chunksize=chunk_rows)
+
+
+def ingest_logs(source, start_date, end_date, granularity="Weekly", transforms=None,
+                method="exact", chunk_rows=DEFAULT_CHUNK_ROWS, precision=HLL_PRECISION):
+    """Per-team distinct-user counts of an event log, one row per calendar period.
+
+    The log needs ``user_id`` and ``timestamp`` columns plus the columns the
+    ``transforms`` (default ``DEFAULT_TRANSFORMS``, a mapping of team name to
+    ``TeamTransform``) filter on; a team whose column is missing from a chunk
+    counts no rows from it. Events are assigned to the period of the calendar
+    (see ``calendar_index``) they fall in; events outside ``start_date`` to
+    ``end_date`` are ignored. ``method`` is ``"exact"`` or ``"hll"``.
+
+    Returns a ``SimulationResult`` (without events) of the teams' counts.
+    """
+    import pandas as pd
+
+    transforms = DEFAULT_TRANSFORMS if transforms is None else transforms
+    teams = list(transforms)
+    period_starts, t = calendar_index(start_date, end_date, granularity)
+    periods = len(period_starts)
+    last_day = np.datetime64(end_date, 'D')
+
+    rows = len(teams) * periods
+    if method == "exact":
+        counter = ExactDistinct(rows)
+    elif method == "hll":
+        counter = HyperLogLog(rows, precision)
+    else:
+        raise ValueError(f"Unknown distinct-count method: {method!r}")
+
+    columns = {"user_id", "timestamp"} | {tr.column for tr in transforms.values()}
+    for chunk in iter_log_chunks(source, columns, chunk_rows):
+        days = pd.to_datetime(chunk["timestamp"], utc=True).dt.tz_localize(None).to_numpy().astype('datetime64[D]')
+        period = np.searchsorted(period_starts, days, side='right') - 1
+        in_range = (period >= 0) & (days <= last_day)
+        # Encode the chunk's users once for every team; missing ids count for no one
+        inverse, uniques = pd.factorize(chunk["user_id"])
+        in_range &= inverse >= 0
+        codes = counter.encode(uniques)[inverse]
+        for k, team in enumerate(teams):
+            transform = transforms[team]
+            if transform.column not in chunk:
+                continue
+            keep = in_range & transform.mask(chunk)
+            if keep.any():
+                counter.add(k * periods + period[keep], codes[keep])
+
+    counts = counter.counts().reshape(len(teams), periods)
+    return SimulationResult.from_matrix(period_starts, t, counts.T, teams)
@@ -0,0 +1,126 @@
+"""Per-stage timing, allocation tracking and profiling of an app rerun.
+
+``StageTimer.stage(name)`` wraps one stage of the pipeline. A disabled timer
+hands out a shared no-op context, so instrumented code costs a method call
+per stage. Enabled, each stage records its wall time and, with
+``track_allocations``, the peak memory ``tracemalloc`` saw while it ran.
+
+``tracemalloc`` is process-wide while timers are per session: tracing is
+started by the first tracking timer and stopped when the last one finishes,
+but the peak is shared, so while several sessions track allocations at once
+a stage's peak can include, or be reset by, another session's work.
+Records can be emitted as one JSON log line (logger ``metric_drift.perf``)
+and appended to a JSON-lines metrics file.
+
+``start_profile`` and ``profile_report`` capture a cProfile of a stretch of
+code (such as one whole rerun) and render its top functions.
+"""
+import contextlib
+import cProfile
+import io
+import json
+import logging
+import pstats
+import threading
+import time
+import tracemalloc
+
+logger = logging.getLogger("metric_drift.perf")
+
+_DISABLED = contextlib.nullcontext()
+
+# Timers currently tracking allocations, and whether they started tracemalloc
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_started_tracing = False
+
+
+def _acquire_tracing():
+    global _tracing_users, _started_tracing
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_users += 1
+
+
+def _release_tracing():
+    global _tracing_users, _started_tracing
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+class StageTimer:
+    """Collects ``{"stage", "seconds"[, "peak_bytes"]}`` records of timed stages."""
+
+    def __init__(self, enabled=False, track_allocations=False):
+        self.enabled = enabled
+        self.track_allocations = enabled and track_allocations
+        self.records = []
+        self._tracing = self.track_allocations
+        if self._tracing:
+            _acquire_tracing()
+
+    def __del__(self):
+        # A rerun interrupted before ``finish`` must not keep tracing on for good
+        if getattr(self, "_tracing", False):
+            _release_tracing()
+
+    def stage(self, name):
+        """Context manager timing the block as stage ``name``."""
+        if not self.enabled:
+            return _DISABLED
+        return self._timed(name)
+
+    @contextlib.contextmanager
+    def _timed(self, name):
+        if self.track_allocations:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {"stage": name, "seconds": time.perf_counter() - start}
+            if self.track_allocations:
+                record["peak_bytes"] = max(0, tracemalloc.get_traced_memory()[1] - before)
+            self.records.append(record)
+
+    def total(self):
+        """Seconds spent in all recorded stages."""
+        return sum(record["seconds"] for record in self.records)
+
+    def finish(self, metrics_file=None, **context):
+        """Release allocation tracing, log the records and append them to ``metrics_file``.
+
+        ``context`` (e.g. the run's parameters) is added to the logged entry.
+        """
+        if self._tracing:
+            _release_tracing()
+            self._tracing = False
+        if not self.enabled:
+            return
+        entry = dict(context, time=time.time(), total_seconds=self.total(), stages=self.records)
+        line = json.dumps(entry, default=str)
+        logger.info(line)
+        if metrics_file:
+            with open(metrics_file, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def start_profile():
+    """Start and return a ``cProfile.Profile``; pass it to ``profile_report`` when done."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def profile_report(profiler, sort="cumulative", limit=30):
+    """Stop ``profiler`` and render its top ``limit`` functions by ``sort`` as text."""
+    profiler.disable()
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
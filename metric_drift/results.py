@@ -0,0 +1,126 @@
+"""Columnar container for simulation results.
+
+A ``SimulationResult`` holds a ``datetime64`` date index, the integer day
+offsets and one contiguous value array per team (a team-major 2-D buffer), in
+float64 or float32. The buffer is preallocated and grows geometrically, so
+runs can be appended to without reallocating per chunk.
+
+Conversions share memory rather than copying: ``to_pandas`` hands the team
+buffer to pandas as a single block, ``to_arrow`` wraps each team's array, and
+``long_frame`` lays the teams end to end exactly as ``DataFrame.melt`` would.
+"""
+import numpy as np
+
+
+class SimulationResult:
+    """Dates, day offsets and per-team values of one run, plus its events."""
+
+    def __init__(self, teams, capacity=0, dtype=np.float64, events=None):
+        self.teams = list(teams)
+        self.events = list(events or [])
+        self._dates = np.empty(capacity, dtype='datetime64[ns]')
+        self._day = np.empty(capacity, dtype=np.int64)
+        self._values = np.empty((len(self.teams), capacity), dtype=dtype)
+        self._length = 0
+
+    @classmethod
+    def from_matrix(cls, dates, day, matrix, teams, events=None, dtype=None):
+        """Result wrapping a (time x team) ``matrix``.
+
+        No copy is made when ``matrix`` is the transpose of a C-contiguous
+        team-major array of the requested ``dtype`` (as ``simulate_matrix``
+        returns).
+        """
+        result = cls(teams, dtype=matrix.dtype if dtype is None else dtype, events=events)
+        result._dates = np.asarray(dates, dtype='datetime64[ns]')
+        result._day = np.asarray(day, dtype=np.int64)
+        result._values = np.ascontiguousarray(matrix.T, dtype=result._values.dtype)
+        result._length = len(result._day)
+        return result
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def dtype(self):
+        return self._values.dtype
+
+    @property
+    def dates(self):
+        return self._dates[:self._length]
+
+    @property
+    def day(self):
+        return self._day[:self._length]
+
+    @property
+    def values(self):
+        """(team x time) view of the values; row ``k`` is team ``k``'s series."""
+        return self._values[:, :self._length]
+
+    @property
+    def matrix(self):
+        """(time x team) view of the values, the layout the divergence functions take."""
+        return self.values.T
+
+    @property
+    def nbytes(self):
+        return self._dates.nbytes + self._day.nbytes + self._values.nbytes
+
+    def team(self, name):
+        """Series of one team."""
+        return self.values[self.teams.index(name)]
+
+    def append(self, dates, day, matrix):
+        """Add the rows of a (time x team) ``matrix``, growing the buffers if needed."""
+        n = len(day)
+        needed = self._length + n
+        if needed > len(self._day):
+            capacity = max(needed, 2 * len(self._day), 64)
+            self._dates = np.resize(self._dates, capacity)
+            self._day = np.resize(self._day, capacity)
+            values = np.empty((len(self.teams), capacity), dtype=self.dtype)
+            values[:, :self._length] = self.values
+            self._values = values
+        self._dates[self._length:needed] = np.asarray(dates, dtype='datetime64[ns]')
+        self._day[self._length:needed] = day
+        self._values[:, self._length:needed] = matrix.T
+        self._length = needed
+
+    def slice(self, start, stop=None):
+        """Result viewing rows ``start:stop`` of this one (no copy)."""
+        part = SimulationResult(self.teams, dtype=self.dtype, events=self.events)
+        part._dates = self.dates[start:stop]
+        part._day = self.day[start:stop]
+        part._values = self.values[:, start:stop]
+        part._length = len(part._day)
+        return part
+
+    def to_pandas(self):
+        """DataFrame with ``date``, ``day`` and one column per team, sharing the team buffer."""
+        import pandas as pd
+
+        df = pd.DataFrame(self.values.T, columns=self.teams, copy=False)
+        df.insert(0, "day", self.day)
+        df.insert(0, "date", self.dates)
+        return df
+
+    def to_arrow(self):
+        """``pyarrow.Table`` with the same columns as ``to_pandas``, wrapping the arrays."""
+        import pyarrow as pa
+
+        columns = [pa.array(self.dates), pa.array(self.day)]
+        columns += [pa.array(np.ascontiguousarray(series)) for series in self.values]
+        return pa.Table.from_arrays(columns, names=["date", "day"] + self.teams)
+
+    def long_frame(self, var_name="Team", value_name="Metric Value"):
+        """Long frame for charting, equivalent to melting ``to_pandas()`` on ``date`` and ``day``."""
+        import pandas as pd
+
+        n = len(self.teams)
+        return pd.DataFrame({
+            "date": np.tile(self.dates, n),
+            "day": np.tile(self.day, n),
+            var_name: np.repeat(self.teams, self._length),
+            value_name: self.values.reshape(-1),
+        })
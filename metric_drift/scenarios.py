@@ -0,0 +1,346 @@
+"""Named scenarios compared side by side with common random numbers.
+
+A ``Scenario`` is one configuration of the global parameters, team weights
+and event schedule. ``run_scenarios`` evaluates several of them over the
+same dates, teams and seed in one pass: each team draws its noise once from
+its seeded stream (see ``seeding``) and every scenario is built around the
+same draws, so the differences between scenarios come from their parameters
+alone. Each scenario's values are exactly those ``simulate`` returns for it.
+
+With a ``ScenarioStore`` every evaluated scenario is written to disk under
+the hash of its full definition (parameters, run range, seed, team
+coefficients and ``SCENARIO_VERSION``), next to the definition itself.
+Evaluating an identical definition again loads the stored values; changing
+anything, or bumping the version when the engine changes, addresses a new
+file. ``ScenarioStore.versions`` lists the stored definitions of a name. A
+store with ``max_entries`` drops its least recently used scenarios beyond
+that many, so it stays bounded however many definitions are tried.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from .calendar import day_offsets, generate_dates
+from .divergence import divergence_summary, mean_pair_difference
+from .engine import simulation_terms
+from .ensemble import AVG_DIVERGENCE
+from .events import Event, build_events
+from .results import SimulationResult
+from .seeding import root_sequence, team_generators
+from .teams import TEAM_REGISTRY, default_team_weights
+
+# Bump when a change to the engine changes the values of a stored definition
+SCENARIO_VERSION = 1
+
+# Scenarios a store keeps by default before pruning the least recently used
+DEFAULT_MAX_ENTRIES = 500
+
+_use_lock = threading.Lock()
+_last_use = 0
+
+
+def _use_stamp():
+    # Strictly increasing nanosecond stamp, so uses within one clock tick still order
+    global _last_use
+    with _use_lock:
+        _last_use = max(time.time_ns(), _last_use + 1)
+        return _last_use
+
+SUMMARY_STATISTICS = {"max_divergence": "Max Divergence", "avg_divergence": "Avg Divergence",
+                      "growth_pct": "Divergence Growth %"}
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """A named parameter and event configuration.
+
+    ``team_weights`` overrides the context weight of some teams (the others
+    keep their registry default). ``events`` is the event schedule (``None``
+    for the built-in events) and ``without_events`` names teams whose events
+    are dropped from it, e.g. to ask what if Marketing had not changed its
+    definition.
+    """
+    name: str
+    base_drift: float = 0.2
+    context_factor: float = 1.0
+    seasonality: float = 0.3
+    noise_level: float = 0.1
+    team_weights: dict = field(default_factory=dict)
+    events: Optional[tuple] = None
+    without_events: tuple = ()
+
+    def weights(self, teams, registry=None):
+        """Context weight of each of ``teams`` in this scenario."""
+        registry = TEAM_REGISTRY if registry is None else registry
+        return {team: float(self.team_weights.get(team, registry[team].default_weight)) for team in teams}
+
+    def schedule(self, max_days):
+        """Event list of a run spanning ``max_days`` days."""
+        events = build_events(max_days) if self.events is None else list(self.events)
+        return [e for e in events if e.team not in self.without_events]
+
+
+def _rounded(value):
+    # Floats rounded as in ``make_key`` so definitions that print the same hash the same
+    if isinstance(value, float):
+        return round(value, 10)
+    if isinstance(value, dict):
+        return {k: _rounded(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_rounded(v) for v in value]
+    return value
+
+
+def scenario_definition(scenario, start_date, end_date, granularity, seed, teams, registry=None):
+    """JSON-serializable definition of everything that determines a scenario's values."""
+    registry = TEAM_REGISTRY if registry is None else registry
+    # Team order fixes the column order, so the coefficients are kept as a list
+    coefficients = [{k: v for k, v in asdict(registry[team]).items() if k not in ("color", "enabled")}
+                    for team in teams]
+    return _rounded({
+        "version": SCENARIO_VERSION,
+        "base_drift": scenario.base_drift,
+        "context_factor": scenario.context_factor,
+        "seasonality": scenario.seasonality,
+        "noise_level": scenario.noise_level,
+        "team_weights": scenario.weights(teams, registry),
+        "events": None if scenario.events is None else [asdict(e) for e in scenario.events],
+        "without_events": sorted(scenario.without_events),
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "granularity": granularity,
+        "seed": seed,
+        "teams": coefficients,
+    })
+
+
+def definition_hash(definition):
+    """Content hash addressing a scenario definition (the scenario name is not part of it)."""
+    text = json.dumps(definition, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:24]
+
+
+class ScenarioStore:
+    """Directory of scenario definitions and their values, addressed by ``definition_hash``.
+
+    ``<hash>.json`` holds the definition with the scenario's name and
+    creation time, ``<hash>.npz`` the dates, day offsets and (time x team)
+    values. Files are written to a temporary name and renamed into place, so
+    concurrent sessions never read a partial file. Every save and load sets
+    the ``.npz`` modification time to an explicit, strictly increasing use
+    stamp, and saving prunes the scenarios least recently used beyond
+    ``max_entries`` (``None`` keeps every one). The directory is created on
+    the first save.
+    """
+
+    def __init__(self, directory, max_entries=DEFAULT_MAX_ENTRIES):
+        self.directory = str(directory)
+        self.max_entries = max_entries
+
+    def _path(self, digest, suffix):
+        return os.path.join(self.directory, digest + suffix)
+
+    def __contains__(self, digest):
+        return os.path.exists(self._path(digest, ".npz")) and os.path.exists(self._path(digest, ".json"))
+
+    def digests(self):
+        """Hashes of the stored scenarios, least recently used first."""
+        if not os.path.isdir(self.directory):
+            return []
+        paths = [os.path.join(self.directory, entry) for entry in os.listdir(self.directory)
+                 if entry.endswith(".npz")]
+        stamps = []
+        for path in paths:
+            try:
+                stamps.append((os.stat(path).st_mtime_ns, os.path.basename(path)[:-len(".npz")]))
+            except FileNotFoundError:  # Pruned by another session meanwhile
+                pass
+        return [digest for _, digest in sorted(stamps)]
+
+    def _touch(self, digest):
+        stamp = _use_stamp()
+        os.utime(self._path(digest, ".npz"), ns=(stamp, stamp))
+
+    def _prune(self):
+        if self.max_entries is None:
+            return
+        digests = self.digests()
+        for digest in digests[:max(0, len(digests) - self.max_entries)]:
+            for suffix in (".npz", ".json"):
+                try:
+                    os.unlink(self._path(digest, suffix))
+                except FileNotFoundError:
+                    pass
+
+    def _write(self, path, write):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def save(self, digest, name, definition, result):
+        """Store ``result`` (a ``SimulationResult``) and its definition under ``digest``."""
+        record = dict(definition, name=name, created=time.time(),
+                      result_events=[asdict(e) for e in result.events])
+        self._write(self._path(digest, ".npz"),
+                    lambda f: np.savez(f, dates=result.dates, day=result.day, values=result.matrix))
+        self._write(self._path(digest, ".json"),
+                    lambda f: f.write(json.dumps(record, indent=2).encode("utf-8")))
+        self._touch(digest)
+        self._prune()
+
+    def definition(self, digest):
+        """Stored definition record of ``digest``."""
+        with open(self._path(digest, ".json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def load(self, digest):
+        """Stored ``SimulationResult`` of ``digest``."""
+        record = self.definition(digest)
+        # Loading counts as use, so pruning keeps the scenarios still reloaded
+        self._touch(digest)
+        with np.load(self._path(digest, ".npz")) as data:
+            return SimulationResult.from_matrix(data["dates"], data["day"], data["values"],
+                                                [team["name"] for team in record["teams"]],
+                                                [Event(**e) for e in record["result_events"]])
+
+    def versions(self, name):
+        """``(hash, definition)`` of every stored definition named ``name``, oldest first."""
+        found = []
+        for digest in self.digests():
+            try:
+                record = self.definition(digest)
+            except FileNotFoundError:  # Pruned by another session meanwhile
+                continue
+            if record.get("name") == name:
+                found.append((digest, record))
+        return sorted(found, key=lambda item: item[1]["created"])
+
+
+def _simulate_batch(scenarios, dates, teams, seed, registry):
+    # All scenarios around one draw per team: (scenario x team x time) values
+    t = day_offsets(dates)
+    max_days = int(t[-1]) if len(t) else 0
+    terms = [simulation_terms(dates, s.base_drift, s.context_factor, s.seasonality, s.noise_level,
+                              s.weights(teams, registry), registry, events=s.schedule(max_days))
+             for s in scenarios]
+    mean = np.stack([term["mean"] for term in terms])
+    scale = np.stack([term["scale"] for term in terms])
+    values = np.empty((len(scenarios), len(teams), len(t)))
+    rngs = team_generators(seed, teams)
+    for k, team in enumerate(teams):
+        z = rngs[team].standard_normal(len(t))
+        np.maximum(scale[:, :, k] * z + mean[:, :, k], 0, out=values[:, k])
+    return [SimulationResult.from_matrix(dates, term["t"], values[i].T, teams, term["events"])
+            for i, term in enumerate(terms)]
+
+
+def run_scenarios(scenarios, start_date, end_date, granularity="Weekly", seed=0, teams=None,
+                  registry=None, store=None, save=True):
+    """Evaluate ``scenarios`` over the same run and return ``{name: SimulationResult}``.
+
+    ``teams`` defaults to the teams enabled in the registry. Scenarios found
+    in ``store`` (a ``ScenarioStore``) are loaded; the others are simulated
+    together in one pass and, unless ``save`` is false, saved to it.
+    ``seed=None`` draws fresh entropy, still shared by all scenarios, and
+    bypasses the store.
+    """
+    names = [s.name for s in scenarios]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Scenario names must be unique, got {names!r}")
+    teams = list(default_team_weights(registry)) if teams is None else list(teams)
+    dates = generate_dates(start_date, end_date, granularity)
+
+    results = {}
+    digests = {}
+    pending = []
+    for scenario in scenarios:
+        if store is not None and seed is not None:
+            definition = scenario_definition(scenario, start_date, end_date, granularity, seed, teams, registry)
+            digests[scenario.name] = (definition_hash(definition), definition)
+            if digests[scenario.name][0] in store:
+                results[scenario.name] = store.load(digests[scenario.name][0])
+                continue
+        pending.append(scenario)
+
+    if pending:
+        for scenario, result in zip(pending, _simulate_batch(pending, dates, teams, root_sequence(seed),
+                                                             registry)):
+            results[scenario.name] = result
+            if save and scenario.name in digests:
+                digest, definition = digests[scenario.name]
+                store.save(digest, scenario.name, definition, result)
+    return {name: results[name] for name in names}
+
+
+def scenario_summary(results, baseline=None):
+    """One row per scenario: every team's final value and the divergence statistics.
+
+    Each column ``X`` is followed by ``X Δ``, its difference from the
+    ``baseline`` scenario (default: the first).
+    """
+    import pandas as pd
+
+    baseline = next(iter(results)) if baseline is None else baseline
+    rows = []
+    for name, result in results.items():
+        values = result.matrix
+        row = {team: float(values[-1, k]) for k, team in enumerate(result.teams)}
+        if len(result.teams) >= 2:
+            summary = divergence_summary(values)
+            row.update({label: summary[key] for key, label in SUMMARY_STATISTICS.items()})
+        rows.append(row)
+    frame = pd.DataFrame(rows, index=pd.Index(list(results), name="Scenario"))
+    base = frame.loc[baseline]
+    columns = {}
+    for column in frame.columns:
+        columns[column] = frame[column]
+        columns[f"{column} Δ"] = frame[column] - base[column]
+    return pd.DataFrame(columns).reset_index()
+
+
+def scenario_deltas(results, baseline=None):
+    """Long frame of each scenario's per-period difference from ``baseline`` (default: the first).
+
+    Columns are ``date``, ``day``, ``Scenario``, ``Series`` (a team or
+    ``"Avg Divergence"`` with at least two teams) and ``Delta``.
+    """
+    import pandas as pd
+
+    baseline = next(iter(results)) if baseline is None else baseline
+
+    def series(result):
+        values = result.matrix
+        if len(result.teams) >= 2:
+            values = np.column_stack([values, mean_pair_difference(values)])
+        return values
+
+    reference = series(results[baseline])
+    frames = []
+    for name, result in results.items():
+        if name == baseline:
+            continue
+        labels = result.teams + ([AVG_DIVERGENCE] if len(result.teams) >= 2 else [])
+        delta = series(result) - reference
+        frames.append(pd.DataFrame({
+            "date": np.tile(result.dates, len(labels)),
+            "day": np.tile(result.day, len(labels)),
+            "Scenario": name,
+            "Series": np.repeat(labels, len(result)),
+            "Delta": delta.T.reshape(-1),
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["date", "day", "Scenario", "Series", "Delta"])
+    return pd.concat(frames, ignore_index=True)
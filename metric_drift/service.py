@@ -0,0 +1,414 @@
+"""HTTP API for simulations and divergence statistics, without Streamlit.
+
+An asyncio service (on Tornado, which Streamlit already depends on) with
+three endpoints:
+
+``POST /divergence``
+    ``{"runs": [{...}, ...], "defaults": {...}}``; returns the Divergence
+    Analysis statistics (``STATISTICS``) of every run, one column per
+    statistic, and an ``error`` column: null, or why that run failed (its
+    statistics are then null and the other runs are unaffected).
+``POST /simulate``
+    One run; returns its ``date``, ``day`` and team series.
+``GET /health``
+    Status and simulation cache counters.
+
+A run is an object of ``start_date`` and ``end_date`` (ISO dates) and
+optionally ``granularity``, ``base_drift``, ``context_factor``,
+``seasonality``, ``noise_level``, ``team_weights`` (team name -> weight),
+``seed`` and ``events`` (``Event`` fields); omitted values take the app's
+defaults. Responses are compact JSON, or an Arrow IPC stream with
+``?format=arrow`` or ``Accept: application/vnd.apache.arrow.stream``.
+
+Simulations run in a worker pool so the event loop never blocks, in batches
+for large requests. Identical runs in flight (within a request or across
+requests) are computed once. Simulated series go through ``SIMULATION_CACHE``
+under the app's keys: started with ``serve_in_background`` inside the
+Streamlit process (see ``METRIC_DRIFT_API_PORT`` in ``app.py``), the app and
+the API reuse each other's runs. Statistics, which are small but requested
+by the thousand, have a cache of their own so they never evict the app's
+entries.
+
+    python -m metric_drift.service --port 8600 [--workers N] [--threads]
+"""
+import argparse
+import asyncio
+import json
+import math
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date
+
+from .cache import SIMULATION_CACHE, LRUCache, make_key, run_key
+from .calendar import GRANULARITIES, generate_dates
+from .divergence import divergence_summary
+from .engine import simulate
+from .events import _event_from_record
+from .sweep import DEFAULT_PARAMETERS, STATISTICS
+from .teams import TEAM_REGISTRY, default_team_weights
+
+DEFAULT_PORT = 8600
+DEFAULT_ADDRESS = "127.0.0.1"
+DEFAULT_SEED = 42
+DEFAULT_GRANULARITY = "Weekly"
+BATCH_SIZE = 32
+SUMMARY_CACHE_SIZE = 100_000
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+# Request size limits: runs per /divergence request, periods per run
+MAX_RUNS = 10_000
+MAX_PERIODS = 36_600
+
+RUN_FIELDS = {"start_date", "end_date", "granularity", "team_weights", "seed", "events"} | set(DEFAULT_PARAMETERS)
+
+
+def parse_run(spec, defaults=None):
+    """Validated run parameters from a request object, with ``defaults`` underneath.
+
+    Raises ``ValueError`` on unknown fields or bad values, including
+    non-finite parameters and weights and runs of more than ``MAX_PERIODS``
+    periods.
+    """
+    spec = dict(defaults or {}, **spec)
+    unknown = set(spec) - RUN_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown run fields: {', '.join(sorted(unknown))}")
+    try:
+        run = {
+            "start_date": date.fromisoformat(spec["start_date"]),
+            "end_date": date.fromisoformat(spec["end_date"]),
+        }
+    except KeyError as missing:
+        raise ValueError(f"Run is missing {missing}") from None
+    except TypeError:
+        raise ValueError("start_date and end_date must be ISO date strings") from None
+    run["granularity"] = spec.get("granularity", DEFAULT_GRANULARITY)
+    if run["granularity"] not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {run['granularity']!r}")
+    periods = len(generate_dates(run["start_date"], run["end_date"], run["granularity"]))
+    if not periods:
+        raise ValueError(f"No {run['granularity']} periods from {run['start_date']} to {run['end_date']}")
+    if periods > MAX_PERIODS:
+        raise ValueError(f"Run has {periods} periods, more than the limit of {MAX_PERIODS}")
+    for name, default in DEFAULT_PARAMETERS.items():
+        run[name] = _finite(spec.get(name, default), name)
+    weights = spec.get("team_weights") or default_team_weights()
+    unknown_teams = set(weights) - set(TEAM_REGISTRY)
+    if unknown_teams:
+        raise ValueError(f"Unknown teams: {', '.join(sorted(unknown_teams))}")
+    run["team_weights"] = {team: _finite(weight, f"{team} weight") for team, weight in weights.items()}
+    run["seed"] = int(spec.get("seed", DEFAULT_SEED))
+    events = spec.get("events")
+    run["events"] = None if events is None else tuple(_event_from_record(event) for event in events)
+    return run
+
+
+def _finite(value, name):
+    # float(value), refusing "nan" and "inf", which would turn into invalid JSON
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be finite, got {value!r}")
+    return value
+
+
+def simulation_key(run):
+    """``SIMULATION_CACHE`` key of a run's simulation, as the app builds it."""
+    return ("simulation",) + run_key(
+        run["start_date"], run["granularity"], run["base_drift"], run["context_factor"],
+        run["seasonality"], run["noise_level"], run["team_weights"], run["seed"], run["events"],
+    ) + make_key(run["end_date"])
+
+
+def simulate_run(run):
+    """Simulate one parsed run; returns its ``SimulationResult``."""
+    dates = generate_dates(run["start_date"], run["end_date"], run["granularity"])
+    return simulate(dates, run["base_drift"], run["context_factor"], run["seasonality"],
+                    run["noise_level"], run["team_weights"], run["seed"], events=run["events"])
+
+
+def _each(compute, runs):
+    # ``compute`` of every run, with a failing run's exception in its place so
+    # it cannot fail the rest of its batch
+    values = []
+    for run in runs:
+        try:
+            values.append(compute(run))
+        except Exception as error:
+            values.append(error)
+    return values
+
+
+def summarize_runs(runs):
+    # Worker entry point: divergence statistics of a batch of runs
+    return _each(lambda run: _statistics(simulate_run(run)), runs)
+
+
+def _statistics(result):
+    summary = divergence_summary(result.matrix)
+    return [float(summary[name]) for name in STATISTICS]
+
+
+class SimulationService:
+    """Coalescing, cached front of a worker pool.
+
+    ``executor`` runs the simulations (a process pool by default); simulated
+    series are kept in ``cache`` under the app's keys and statistics in
+    ``summary_cache``.
+    """
+
+    def __init__(self, executor=None, cache=SIMULATION_CACHE, batch_size=BATCH_SIZE, summary_cache=None):
+        self.executor = executor or ProcessPoolExecutor()
+        self.cache = cache
+        if summary_cache is None:
+            summary_cache = LRUCache(maxsize=SUMMARY_CACHE_SIZE, ttl=cache.ttl)
+        self.summary_cache = summary_cache
+        self.batch_size = batch_size
+        self._in_flight = {}
+
+    async def _gather(self, keys, compute_batch):
+        # Values of ``keys``: one shared future per distinct key in flight, and
+        # the missing ones computed in batches in the pool. ``compute_batch``
+        # returns an exception in place of a value that failed; failures come
+        # back as exception values, one per key, never raised
+        loop = asyncio.get_running_loop()
+        futures, missing = {}, []
+        for key, item in keys.items():
+            if key in self._in_flight:
+                futures[key] = self._in_flight[key]
+                continue
+            future = loop.create_future()
+            self._in_flight[key] = futures[key] = future
+            missing.append((key, item))
+
+        async def run(batch):
+            try:
+                values = await loop.run_in_executor(self.executor, compute_batch, [item for _, item in batch])
+            except Exception as error:
+                for key, _ in batch:
+                    futures[key].set_exception(error)
+            else:
+                for (key, _), value in zip(batch, values):
+                    if isinstance(value, Exception):
+                        futures[key].set_exception(value)
+                    else:
+                        futures[key].set_result(value)
+            finally:
+                for key, _ in batch:
+                    del self._in_flight[key]
+
+        tasks = [asyncio.ensure_future(run(missing[start:start + self.batch_size]))
+                 for start in range(0, len(missing), self.batch_size)]
+        results = {}
+        for key, future in futures.items():
+            try:
+                results[key] = await future
+            except Exception as error:
+                results[key] = error
+        await asyncio.gather(*tasks)
+        return results
+
+    async def summaries(self, runs):
+        """Divergence statistics (``STATISTICS`` order) of each parsed run.
+
+        A run whose simulation failed gets its exception instead.
+        """
+        stats, pending = {}, {}
+        for run in runs:
+            key = simulation_key(run)
+            if key in stats or key in pending:
+                continue
+            cached = self.summary_cache.get(key)
+            if cached is None:
+                simulated = self.cache.get(key)
+                if simulated is not None:
+                    # Simulated already (e.g. by the app); the statistics are cheap
+                    cached = _statistics(simulated[0])
+                    self.summary_cache.put(key, cached)
+            if cached is not None:
+                stats[key] = cached
+            else:
+                pending[key] = run
+        computed = await self._gather({("summary",) + key: run for key, run in pending.items()},
+                                      summarize_runs)
+        for key, value in computed.items():
+            if not isinstance(value, Exception):
+                self.summary_cache.put(key[1:], value)
+            stats[key[1:]] = value
+        return [stats[simulation_key(run)] for run in runs]
+
+    async def result(self, run):
+        """``SimulationResult`` of one parsed run."""
+        key = simulation_key(run)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached[0]
+        computed = await self._gather({key: run}, _simulate_batch)
+        result = computed[key]
+        if isinstance(result, Exception):
+            raise result
+        self.cache.put(key, (result, result.events))
+        return result
+
+
+def _simulate_batch(runs):
+    return _each(simulate_run, runs)
+
+
+def _summary_columns(stats):
+    # Statistics of failed runs are null, with the failure in ``error``
+    failed = [isinstance(row, Exception) for row in stats]
+    columns = {name: [None if bad else row[k] for row, bad in zip(stats, failed)]
+               for k, name in enumerate(STATISTICS)}
+    columns["error"] = [f"{type(row).__name__}: {row}" if bad else None for row, bad in zip(stats, failed)]
+    return columns
+
+
+def encode_json(columns):
+    """Compact JSON bytes of a dict of columns."""
+    return json.dumps(columns, separators=(",", ":"), default=str).encode()
+
+
+def encode_arrow(table):
+    """Arrow IPC stream bytes of a ``pyarrow.Table``."""
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _summary_body(stats, arrow):
+    columns = _summary_columns(stats)
+    if arrow:
+        import pyarrow as pa
+        return encode_arrow(pa.table(columns))
+    return encode_json(columns)
+
+
+def _result_body(result, arrow):
+    if arrow:
+        return encode_arrow(result.to_arrow())
+    columns = {"date": result.dates.astype("datetime64[D]").astype(str).tolist(),
+               "day": result.day.tolist()}
+    columns.update((team, series.tolist()) for team, series in zip(result.teams, result.values))
+    return encode_json(columns)
+
+
+def make_app(service):
+    """Tornado application serving ``service``."""
+    import tornado.web
+
+    class Handler(tornado.web.RequestHandler):
+        def wants_arrow(self):
+            return (self.get_query_argument("format", "json") == "arrow"
+                    or ARROW_STREAM in self.request.headers.get("Accept", ""))
+
+        def body(self):
+            try:
+                return json.loads(self.request.body or b"{}")
+            except ValueError as error:
+                raise tornado.web.HTTPError(400, reason=f"Invalid JSON: {error}")
+
+        async def respond(self, encode, *args):
+            arrow = self.wants_arrow()
+            # Encoding large results is CPU work too; keep it off the event loop
+            payload = await asyncio.get_running_loop().run_in_executor(None, encode, *args, arrow)
+            self.set_header("Content-Type", ARROW_STREAM if arrow else "application/json")
+            self.write(payload)
+
+        def write_error(self, status_code, **kwargs):
+            self.set_header("Content-Type", "application/json")
+            self.finish(encode_json({"error": self._reason}))
+
+    class DivergenceHandler(Handler):
+        async def post(self):
+            body = self.body()
+            if len(body.get("runs") or ()) > MAX_RUNS:
+                raise tornado.web.HTTPError(400, reason=f"At most {MAX_RUNS} runs per request")
+            try:
+                runs = [parse_run(spec, body.get("defaults")) for spec in body["runs"]]
+            except (KeyError, TypeError, ValueError) as error:
+                raise tornado.web.HTTPError(400, reason=f"Bad runs: {error}")
+            if any(len(run["team_weights"]) < 2 for run in runs):
+                raise tornado.web.HTTPError(400, reason="Divergence needs at least two teams per run")
+            await self.respond(_summary_body, await service.summaries(runs))
+
+    class SimulateHandler(Handler):
+        async def post(self):
+            try:
+                run = parse_run(self.body())
+            except (TypeError, ValueError) as error:
+                raise tornado.web.HTTPError(400, reason=f"Bad run: {error}")
+            await self.respond(_result_body, await service.result(run))
+
+    class HealthHandler(Handler):
+        def get(self):
+            self.set_header("Content-Type", "application/json")
+            self.write(encode_json({"status": "ok", "cache": service.cache.stats(),
+                                    "summary_cache": service.summary_cache.stats()}))
+
+    return tornado.web.Application([
+        (r"/divergence", DivergenceHandler),
+        (r"/simulate", SimulateHandler),
+        (r"/health", HealthHandler),
+    ])
+
+
+async def serve(port=DEFAULT_PORT, service=None, address=DEFAULT_ADDRESS):
+    """Serve the API on ``port`` of ``address`` until cancelled.
+
+    The API has no authentication, so it listens on the loopback interface
+    unless another ``address`` (``""`` for all interfaces) is given.
+    """
+    service = service or SimulationService()
+    server = make_app(service).listen(port, address)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        server.stop()
+
+
+_background = {}
+_background_lock = threading.Lock()
+
+
+def serve_in_background(port=DEFAULT_PORT, max_workers=None, address=None):
+    """Start the API in a daemon thread of this process, once per port.
+
+    Runs go to a thread pool, which shares ``SIMULATION_CACHE`` with the rest
+    of the process (the Streamlit app, when called from it). ``address``
+    defaults to ``DEFAULT_ADDRESS`` (see ``serve``).
+    """
+    address = DEFAULT_ADDRESS if address is None else address
+    with _background_lock:
+        if port not in _background:
+            service = SimulationService(ThreadPoolExecutor(max_workers))
+            thread = threading.Thread(target=asyncio.run, args=(serve(port, service, address),),
+                                      name=f"metric-drift-api-{port}", daemon=True)
+            thread.start()
+            _background[port] = thread
+        return _background[port]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the metric drift simulation API over HTTP.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--address", default=DEFAULT_ADDRESS,
+                        help='Interface to listen on ("" for all interfaces)')
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--threads", action="store_true", help="Use worker threads instead of processes")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Runs per worker task")
+    args = parser.parse_args(argv)
+
+    pool = ThreadPoolExecutor if args.threads else ProcessPoolExecutor
+    service = SimulationService(pool(args.workers), batch_size=args.batch_size)
+    print(f"Serving on http://{args.address or 'localhost'}:{args.port}")
+    try:
+        asyncio.run(serve(args.port, service, args.address))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Headless parameter sweeps over the sidebar parameters.
+
+A sweep evaluates many parameter sets (a full grid or a Latin-hypercube
+sample) and records the divergence statistics shown in the Divergence
+Analysis tab for each of them. Runs are batched and fanned out over a process
+pool; every run gets its own seed spawned from the sweep seed and its index,
+so results do not depend on how runs are spread across workers.
+
+Example::
+
+    python -m metric_drift.sweep --start 2024-01-01 --end 2024-12-31 \\
+        --granularity Daily --lhs 2000 --threshold 60 --out sweep.npz
+"""
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+
+from .calendar import GRANULARITIES, generate_dates
+from .divergence import divergence_summary
+from .engine import simulate_matrix
+from .events import compile_events, load_events
+from .seeding import root_sequence
+from .teams import TEAM_REGISTRY, default_team_weights
+
+# Sidebar defaults and slider ranges of the global parameters
+DEFAULT_PARAMETERS = {"base_drift": 0.2, "context_factor": 1.0, "seasonality": 0.3, "noise_level": 0.1}
+PARAMETER_RANGES = {
+    "base_drift": (0.0, 1.0),
+    "context_factor": (0.0, 2.0),
+    "seasonality": (0.0, 1.0),
+    "noise_level": (0.0, 0.5),
+}
+WEIGHT_RANGE = (0.5, 1.5)
+
+STATISTICS = ("max_divergence", "max_delta", "avg_divergence", "avg_delta", "growth_pct")
+
+
+def weight_parameter(team):
+    """Sweep parameter name of a team's context weight, e.g. ``finance_weight``."""
+    return f"{team.lower()}_weight"
+
+
+def sweep_defaults(teams):
+    """Default value of every sweep parameter for ``teams``."""
+    defaults = dict(DEFAULT_PARAMETERS)
+    for team in teams:
+        defaults[weight_parameter(team)] = TEAM_REGISTRY[team].default_weight
+    return defaults
+
+
+def sweep_ranges(teams):
+    """Slider range of every sweep parameter for ``teams``."""
+    ranges = dict(PARAMETER_RANGES)
+    for team in teams:
+        ranges[weight_parameter(team)] = WEIGHT_RANGE
+    return ranges
+
+
+def grid(axes):
+    """Full Cartesian product of ``axes`` (parameter name -> values) as columns."""
+    names = list(axes)
+    rows = list(itertools.product(*(axes[name] for name in names)))
+    return {name: np.array([row[k] for row in rows], dtype=float) for k, name in enumerate(names)}
+
+
+def latin_hypercube(n, ranges, seed=None):
+    """``n`` Latin-hypercube samples over ``ranges`` (parameter name -> (low, high)) as columns.
+
+    Each range is split into ``n`` equal strata and every stratum is sampled
+    exactly once per parameter.
+    """
+    rng = np.random.default_rng(seed)
+    samples = {}
+    for name, (low, high) in ranges.items():
+        u = (rng.permutation(n) + rng.random(n)) / n
+        samples[name] = low + u * (high - low)
+    return samples
+
+
+def _run_batch(dates, teams, registry, columns, entropy, start, events):
+    # Worker entry point: simulate one batch of runs and return their statistics
+    n = len(next(iter(columns.values())))
+    stats = np.empty((n, len(STATISTICS)))
+    for k in range(n):
+        params = {name: values[k] for name, values in columns.items()}
+        team_weights = {team: params[weight_parameter(team)] for team in teams}
+        seed = np.random.SeedSequence(entropy, spawn_key=(start + k,))
+        values, _ = simulate_matrix(dates, params["base_drift"], params["context_factor"],
+                                    params["seasonality"], params["noise_level"], team_weights,
+                                    seed, registry, events=events)
+        summary = divergence_summary(values)
+        stats[k] = [summary[name] for name in STATISTICS]
+    return start, stats
+
+
+def run_sweep(samples, start_date, end_date, granularity="Weekly", teams=None, seed=0,
+              threshold=None, max_workers=None, batch_size=64, events=None):
+    """Simulate every parameter set in ``samples`` and summarize its divergence.
+
+    ``samples`` maps parameter names to equal-length value arrays (see
+    ``grid`` and ``latin_hypercube``); parameters it omits keep their sidebar
+    defaults. ``teams`` defaults to the teams enabled in the registry and
+    needs at least two entries. Runs are sent to a ``ProcessPoolExecutor`` in
+    batches of ``batch_size``; ``max_workers=1`` runs them in this process.
+    ``events`` is the event schedule of every run (default: ``build_events``).
+
+    Returns a dict of columns: every parameter, the divergence statistics and,
+    if ``threshold`` is given, ``exceeds_threshold`` (final max divergence
+    above it).
+    """
+    teams = list(default_team_weights()) if teams is None else list(teams)
+    if len(teams) < 2:
+        raise ValueError("A sweep needs at least two teams to measure divergence")
+    unknown = set(samples) - set(sweep_defaults(teams))
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+
+    n = len(next(iter(samples.values()))) if samples else 1
+    columns = {name: np.full(n, value, dtype=float) for name, value in sweep_defaults(teams).items()}
+    columns.update({name: np.asarray(values, dtype=float) for name, values in samples.items()})
+
+    dates = generate_dates(start_date, end_date, granularity)
+    registry = {team: TEAM_REGISTRY[team] for team in teams}
+    entropy = root_sequence(seed).entropy
+    timeline = None if events is None else compile_events(events)
+    batches = [
+        (dates, teams, registry, {name: values[start:start + batch_size] for name, values in columns.items()},
+         entropy, start, timeline)
+        for start in range(0, n, batch_size)
+    ]
+
+    stats = np.empty((n, len(STATISTICS)))
+    if max_workers == 1:
+        for batch in batches:
+            start, batch_stats = _run_batch(*batch)
+            stats[start:start + len(batch_stats)] = batch_stats
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for start, batch_stats in pool.map(_run_batch, *zip(*batches)):
+                stats[start:start + len(batch_stats)] = batch_stats
+
+    for k, name in enumerate(STATISTICS):
+        columns[name] = stats[:, k]
+    if threshold is not None:
+        columns["exceeds_threshold"] = columns["max_divergence"] > threshold
+    return columns
+
+
+def save_results(results, path):
+    """Write sweep columns to ``path``: Parquet for ``.parquet`` (needs pyarrow), else compressed ``.npz``."""
+    path = str(path)
+    if path.endswith(".parquet"):
+        import pandas as pd
+        pd.DataFrame(results).to_parquet(path, index=False)
+    else:
+        np.savez_compressed(path, **results)
+
+
+def _parse_assignment(text):
+    # "name=1,2,3" -> ("name", [1.0, 2.0, 3.0])
+    name, _, values = text.partition("=")
+    if not values:
+        raise argparse.ArgumentTypeError(f"expected name=value[,value...], got {text!r}")
+    return name.strip(), [float(v) for v in values.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep metric drift parameters and record divergence.")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, required=True, help="End date (YYYY-MM-DD)")
+    parser.add_argument("--granularity", choices=GRANULARITIES, default="Weekly")
+    parser.add_argument("--teams", nargs="+", help="Teams to simulate (default: registry defaults)")
+    sampling = parser.add_mutually_exclusive_group(required=True)
+    sampling.add_argument("--grid", type=_parse_assignment, action="append",
+                          help="Grid axis as name=v1,v2,...; repeat for more axes")
+    sampling.add_argument("--lhs", type=int, metavar="N", help="Latin-hypercube sample of N parameter sets")
+    parser.add_argument("--range", type=_parse_assignment, action="append", default=[],
+                        help="Override a Latin-hypercube range as name=low,high")
+    parser.add_argument("--events", help="Event schedule file (JSON or CSV; default: built-in events)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threshold", type=float, help="Flag runs whose final max divergence exceeds this")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--out", required=True, help="Output file (.npz or .parquet)")
+    args = parser.parse_args(argv)
+
+    teams = args.teams or list(default_team_weights())
+    if args.grid:
+        samples = grid(dict(args.grid))
+    else:
+        ranges = sweep_ranges(teams)
+        ranges.update({name: tuple(values) for name, values in args.range})
+        samples = latin_hypercube(args.lhs, ranges, seed=args.seed)
+
+    results = run_sweep(samples, args.start, args.end, args.granularity, teams=teams, seed=args.seed,
+                        threshold=args.threshold, max_workers=args.workers, batch_size=args.batch_size,
+                        events=load_events(args.events) if args.events else None)
+    save_results(results, args.out)
+
+    summary = f"{len(results['max_divergence'])} runs written to {args.out}"
+    if args.threshold is not None:
+        summary += f"; {int(results['exceeds_threshold'].sum())} exceed max divergence {args.threshold:g}"
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
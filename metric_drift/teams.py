@@ -0,0 +1,77 @@
+"""Declarative registry of the teams whose view of the metric is simulated.
+
+Each team is described by a handful of coefficients instead of its own code
+path; ``team_arrays`` packs the coefficients of the selected teams into
+parallel arrays so the engine evaluates all teams at once.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class TeamSpec:
+    """How one team transforms the shared base metric.
+
+    The team's value at day ``t`` is::
+
+        base * (1 + level * context * weight)
+        + drift_sign * (base_drift * t * drift_rate * weight + events * event_step * context * weight)
+        + base * noise_level * noise_scale * N(0, 1)
+
+    clipped at zero, where ``events`` is the combined effect of the team's events
+    in force (see ``events``; a plain step event counts 1).
+    """
+    name: str
+    level: float
+    drift_rate: float
+    drift_sign: int
+    event_step: float
+    noise_scale: float
+    default_weight: float = 1.0
+    color: str = "#6B7280"
+    enabled: bool = True
+
+
+TEAM_REGISTRY = {}
+
+
+def register_team(spec):
+    """Add ``spec`` to the registry, replacing any team with the same name."""
+    TEAM_REGISTRY[spec.name] = spec
+    return spec
+
+
+# Finance team (tends to be conservative, focuses on recognized revenue)
+register_team(TeamSpec("Finance", level=0.1, drift_rate=0.15, drift_sign=-1, event_step=5,
+                       noise_scale=0.5, default_weight=1.2, color="#047857"))
+# Product team (focuses on user engagement and product usage); its event
+# filters out data, which reduces the drift
+register_team(TeamSpec("Product", level=-0.05, drift_rate=0.2, drift_sign=-1, event_step=-8,
+                       noise_scale=0.7, default_weight=0.8, color="#4F46E5"))
+# Marketing team (focuses on attribution and campaign performance)
+register_team(TeamSpec("Marketing", level=0.15, drift_rate=0.25, drift_sign=1, event_step=12,
+                       noise_scale=1.0, default_weight=1.0, color="#B91C1C"))
+
+
+def team_arrays(team_weights, registry=None):
+    """Coefficient arrays, one entry per team in ``team_weights`` order.
+
+    ``team_weights`` maps team name to its context weight.
+    """
+    registry = TEAM_REGISTRY if registry is None else registry
+    specs = [registry[name] for name in team_weights]
+    return {
+        "level": np.array([s.level for s in specs], dtype=float),
+        "drift_rate": np.array([s.drift_rate for s in specs], dtype=float),
+        "drift_sign": np.array([s.drift_sign for s in specs], dtype=float),
+        "event_step": np.array([s.event_step for s in specs], dtype=float),
+        "noise_scale": np.array([s.noise_scale for s in specs], dtype=float),
+        "weight": np.array(list(team_weights.values()), dtype=float),
+    }
+
+
+def default_team_weights(registry=None):
+    """Default weights of the teams enabled by default."""
+    registry = TEAM_REGISTRY if registry is None else registry
+    return {name: spec.default_weight for name, spec in registry.items() if spec.enabled}
@@ -0,0 +1,68 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from metric_drift import GRANULARITIES, calendar_index, generate_dates
+
+
+def days(*values):
+    return np.array(values, dtype='datetime64[D]')
+
+
+def test_monthly_clamps_to_month_end():
+    dates = generate_dates(date(2024, 1, 31), date(2024, 5, 1), "Monthly")
+    np.testing.assert_array_equal(dates, days("2024-01-31", "2024-02-29", "2024-03-31", "2024-04-30"))
+
+
+def test_monthly_non_leap_february():
+    dates = generate_dates(date(2023, 1, 30), date(2023, 3, 30), "Monthly")
+    np.testing.assert_array_equal(dates, days("2023-01-30", "2023-02-28", "2023-03-30"))
+
+
+def test_quarterly_clamps_to_month_end():
+    dates = generate_dates(date(2023, 11, 30), date(2024, 12, 31), "Quarterly")
+    np.testing.assert_array_equal(
+        dates, days("2023-11-30", "2024-02-29", "2024-05-30", "2024-08-30", "2024-11-30"))
+
+
+def test_month_end_starts_after_start_date():
+    dates = generate_dates(date(2024, 1, 15), date(2024, 4, 29), "Month End")
+    np.testing.assert_array_equal(dates, days("2024-01-31", "2024-02-29", "2024-03-31"))
+
+
+@pytest.mark.parametrize("granularity, weeks", [
+    ("Fiscal 4-4-5", (4, 4, 5)),
+    ("Fiscal 4-5-4", (4, 5, 4)),
+    ("Fiscal 5-4-4", (5, 4, 4)),
+])
+def test_fiscal_quarters_are_13_weeks(granularity, weeks):
+    start = date(2024, 2, 4)
+    dates, t = calendar_index(start, date(2026, 2, 1), granularity)
+    gaps = np.diff(t)
+    np.testing.assert_array_equal(gaps[:3], np.array(weeks) * 7)
+    np.testing.assert_array_equal(np.diff(t[::3]), 13 * 7)
+    # Two 52-week fiscal years
+    assert dates[24] == np.datetime64(start) + 2 * 52 * 7
+    assert t[0] == 0 and dates[0] == np.datetime64(start)
+
+
+@pytest.mark.parametrize("granularity", GRANULARITIES)
+def test_end_before_start_is_empty(granularity):
+    dates, t = calendar_index(date(2024, 6, 1), date(2024, 5, 31), granularity)
+    assert dates.dtype == np.dtype('datetime64[D]') and len(dates) == 0
+    assert t.dtype == np.int64 and len(t) == 0
+
+
+@pytest.mark.parametrize("granularity", GRANULARITIES)
+def test_dates_within_range(granularity):
+    start, end = date(2024, 1, 31), date(2025, 3, 15)
+    dates, t = calendar_index(start, end, granularity)
+    assert dates[0] >= np.datetime64(start) and dates[-1] <= np.datetime64(end)
+    assert (np.diff(t) > 0).all()
+    np.testing.assert_array_equal(t, (dates - np.datetime64(start)).astype(np.int64))
+
+
+def test_unknown_granularity():
+    with pytest.raises(ValueError, match="granularity"):
+        calendar_index(date(2024, 1, 1), date(2024, 2, 1), "Fortnightly")
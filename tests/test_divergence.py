@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from metric_drift import divergence_chart_data, divergence_frame, divergence_summary, generate_dates, simulate
+from metric_drift.divergence import max_pair_difference, mean_pair_difference, pair_differences, pair_labels
+
+rng = np.random.default_rng(4)
+MATRICES = {
+    "two teams": rng.normal(100, 20, (50, 2)),
+    "many teams": rng.normal(100, 20, (50, 7)),
+    # Repeated values within a row, including rows of identical teams
+    "ties": rng.integers(0, 3, (50, 5)).astype(float),
+}
+
+
+@pytest.mark.parametrize("values", MATRICES.values(), ids=MATRICES.keys())
+def test_mean_pair_difference_matches_pairs(values):
+    np.testing.assert_allclose(mean_pair_difference(values), pair_differences(values).mean(-1),
+                               atol=1e-9)
+
+
+@pytest.mark.parametrize("values", MATRICES.values(), ids=MATRICES.keys())
+def test_max_pair_difference_matches_pairs(values):
+    np.testing.assert_array_equal(max_pair_difference(values), pair_differences(values).max(-1))
+
+
+def test_single_team_is_nan():
+    values = np.ones((4, 1))
+    assert np.isnan(mean_pair_difference(values)).all()
+    assert np.isnan(max_pair_difference(values)).all()
+
+
+def reference_summary(values):
+    """The Divergence tab's original statistics, from the wide per-pair frame."""
+    teams = [f"Team {k}" for k in range(values.shape[1])]
+    pairs = pair_labels(teams)
+    analysis_df = pd.DataFrame(values, columns=teams)
+    for pair, (i, j) in zip(pairs, zip(*np.triu_indices(len(teams), k=1))):
+        analysis_df[pair] = abs(analysis_df[teams[i]] - analysis_df[teams[j]])
+    analysis_df['Avg Divergence'] = analysis_df[pairs].mean(axis=1)
+    first_point, last_point = analysis_df.iloc[0], analysis_df.iloc[-1]
+    start_avg, end_avg = first_point['Avg Divergence'], last_point['Avg Divergence']
+    return {
+        "max_divergence": last_point[pairs].max(),
+        "max_delta": last_point[pairs].max() - first_point[pairs].max(),
+        "avg_divergence": end_avg,
+        "avg_delta": end_avg - start_avg,
+        "growth_pct": ((end_avg - start_avg) / start_avg * 100) if start_avg > 0 else 0,
+    }
+
+
+@pytest.mark.parametrize("values", MATRICES.values(), ids=MATRICES.keys())
+def test_summary_matches_pair_frame(values):
+    assert divergence_summary(values) == pytest.approx(reference_summary(values))
+
+
+def test_summary_without_initial_divergence():
+    values = np.array([[5.0, 5.0, 5.0], [4.0, 6.0, 8.0]])
+    summary = divergence_summary(values)
+    assert summary["growth_pct"] == 0
+    assert summary == pytest.approx(reference_summary(values))
+
+
+def test_chart_data_matches_wide_frame():
+    result = simulate(generate_dates("2024-01-01", "2024-03-31", "Daily"), 0.2, 1.0, 0.3, 0.1,
+                      {"Product": 1.0, "Finance": 1.0, "Marketing": 1.0}, 0)
+    analysis_df, pairs = divergence_frame(result)
+    expected = analysis_df.melt(id_vars=['date', 'day'], value_vars=pairs,
+                                var_name='Team Comparison', value_name='Absolute Difference')
+    pd.testing.assert_frame_equal(divergence_chart_data(result), expected, check_dtype=False)
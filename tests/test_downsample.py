@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from metric_drift import downsample_indices, downsample_long, lttb_indices, minmax_indices
+
+N = 10_000
+X = np.arange(N, dtype=float)
+Y = np.random.default_rng(6).normal(0, 1, N).cumsum()
+# Isolated spikes a bucket average would flatten
+PEAKS = (1234, 5678)
+Y[PEAKS[0]] += 500
+Y[PEAKS[1]] -= 500
+
+
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+@pytest.mark.parametrize("max_points", [2, 3, 4, 5, 100, 1001, 2000])
+def test_point_budget_and_ends(method, max_points):
+    indices = downsample_indices(X, Y, max_points, method)
+    assert len(indices) <= max_points
+    assert indices[0] == 0 and indices[-1] == N - 1
+    assert (np.diff(indices) > 0).all()
+
+
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+def test_short_series_kept_whole(method):
+    np.testing.assert_array_equal(downsample_indices(X[:50], Y[:50], 50, method), np.arange(50))
+
+
+def test_minmax_keeps_extremes():
+    indices = minmax_indices(Y, 200)
+    assert set(PEAKS) <= set(indices)
+    assert Y.argmax() in indices and Y.argmin() in indices
+    # Every bucket's extremes are kept, so the kept range is the full range
+    assert Y[indices].max() == Y.max() and Y[indices].min() == Y.min()
+
+
+def test_lttb_keeps_peaks():
+    indices = lttb_indices(X, Y, 200)
+    assert len(indices) == 200
+    assert set(PEAKS) <= set(indices)
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError, match="downsampling method"):
+        downsample_indices(X, Y, 100, "every-nth")
+
+
+def long_frame(teams=3):
+    return pd.DataFrame({
+        "day": np.tile(X, teams),
+        "Team": np.repeat([f"Team {k}" for k in range(teams)], N),
+        "Metric Value": np.concatenate([Y + 10 * k for k in range(teams)]),
+    })
+
+
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+def test_downsample_long_budget_and_peaks(method):
+    df = long_frame()
+    thinned = downsample_long(df, "Team", "Metric Value", 600, method)
+    assert len(thinned) <= 600
+    assert thinned.index.is_monotonic_increasing
+    for team, rows in thinned.groupby("Team"):
+        days = rows["day"].to_numpy()
+        assert days[0] == 0 and days[-1] == N - 1
+        assert set(PEAKS) <= set(days.astype(int))
+
+
+def test_downsample_long_keeps_small_frames():
+    df = long_frame().iloc[::100]
+    assert downsample_long(df, "Team", "Metric Value", 1000) is df
+
+
+def test_downsample_long_band_columns():
+    df = long_frame(teams=2)
+    df["p5"] = df["Metric Value"] - 1
+    df["p95"] = df["Metric Value"].where(df["day"] != 42, 1e6)
+    thinned = downsample_long(df, "Team", ["p5", "p95"], 400)
+    assert len(thinned) <= 400
+    assert (thinned["p95"] == 1e6).sum() == 2
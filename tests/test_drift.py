@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from metric_drift import CHANGE_POINT_METHODS, change_points, detect_drift, rolling_stats
+from metric_drift.drift import _lindley
+
+
+def test_lindley_matches_loop():
+    increments = np.random.default_rng(0).normal(-0.1, 1.0, 2000)
+    expected = np.empty_like(increments)
+    s = 0.0
+    for i, inc in enumerate(increments):
+        s = max(0.0, s + inc)
+        expected[i] = s
+    np.testing.assert_allclose(_lindley(increments), expected, atol=1e-9)
+
+
+@pytest.mark.parametrize("window", [1, 2, 7, 30])
+def test_rolling_stats_match_pandas(window):
+    # A large offset checks the sums of squares stay well conditioned
+    x = 1e6 + np.linspace(0, 50, 500)[:, None] + np.random.default_rng(1).normal(0, 5, (500, 3))
+    mean, std = rolling_stats(x, window)
+    rolling = pd.DataFrame(x).rolling(window, min_periods=1)
+    np.testing.assert_allclose(mean, rolling.mean().to_numpy(), rtol=1e-12)
+    # Differences of running sums are exact to the series' scale, not the window's
+    np.testing.assert_allclose(std, rolling.std().to_numpy(), rtol=1e-6, atol=1e-4)
+
+
+def test_rolling_stats_empty():
+    mean, std = rolling_stats(np.array([]), 5)
+    assert mean.shape == std.shape == (0,)
+
+
+@pytest.mark.parametrize("method", CHANGE_POINT_METHODS)
+def test_change_point_on_step(method):
+    x = np.random.default_rng(2).normal(10, 1, 400)
+    x[250:] += 4
+    found = change_points(x, 50, method)
+    assert len(found) >= 1
+    start, alarm = found[0]
+    assert 245 <= start <= 252
+    assert start <= alarm < 260
+
+
+@pytest.mark.parametrize("method", CHANGE_POINT_METHODS)
+def test_no_change_point_without_step(method):
+    x = np.random.default_rng(3).normal(10, 1, 400)
+    assert change_points(x, 50, method, threshold=8) == []
+
+
+def test_change_points_unknown_method():
+    with pytest.raises(ValueError, match="change-point method"):
+        change_points(np.zeros(100), 10, "ewma")
+
+
+def test_detect_drift_flags_breach():
+    t = np.arange(300)
+    values = np.column_stack([np.full(300, 100.0), 100.0 + np.where(t >= 200, 60.0, 0.0)])
+    drift = detect_drift(values, window=10, tolerance=0.25)
+    assert drift["change_points"][0][0] == 200
+    assert drift["breaches"] == [(drift["breaches"][0][0], 300)]
+    assert 200 < drift["breaches"][0][0] < 210
+    with pytest.raises(ValueError):
+        detect_drift(values[:, :1])
@@ -0,0 +1,56 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from metric_drift import generate_dates, simulate, simulate_metric_drift, simulate_metric_drift_reference
+
+MODS = {"Finance": 1.2, "Product": 0.8, "Marketing": 1.0}
+TEAM_SUBSETS = [
+    ("Finance", "Product", "Marketing"),
+    ("Finance", "Marketing"),
+    ("Product",),
+]
+
+
+def reference(dates, teams, seed, params=(0.2, 1.0, 0.3, 0.1)):
+    flags = {f"include_{team.lower()}": team in teams for team in MODS}
+    return simulate_metric_drift_reference(dates, *params, *MODS.values(), seed=seed, **flags)
+
+
+def assert_same_run(dates, teams, seed, params=(0.2, 1.0, 0.3, 0.1)):
+    weights = {team: MODS[team] for team in teams}
+    got, got_events = simulate_metric_drift(dates, *params, weights, seed=seed)
+    want, want_events = reference(dates, teams, seed, params)
+    assert got_events == want_events
+    pd.testing.assert_frame_equal(got.drop(columns="date"), want.drop(columns="date"),
+                                  check_dtype=False, rtol=1e-12)
+    np.testing.assert_array_equal(got["date"].to_numpy(), pd.to_datetime(want["date"]).to_numpy())
+
+
+@pytest.mark.parametrize("periods", [1, 40, 100, 1000])
+@pytest.mark.parametrize("teams", TEAM_SUBSETS)
+@pytest.mark.parametrize("seed", [0, 7, 12345])
+def test_matches_reference(periods, teams, seed):
+    dates = [date(2024, 1, 1) + timedelta(days=i) for i in range(periods)]
+    assert_same_run(dates, teams, seed)
+
+
+@pytest.mark.parametrize("granularity", ["Daily", "Weekly", "Monthly", "Month End"])
+def test_matches_reference_on_generated_calendar(granularity):
+    dates = generate_dates(date(2023, 2, 15), date(2025, 2, 14), granularity)
+    assert_same_run(dates, tuple(MODS), seed=42, params=(0.6, 1.5, 0.8, 0.4))
+
+
+def test_team_noise_is_independent_of_other_teams():
+    dates = generate_dates(date(2024, 1, 1), date(2024, 10, 1), "Daily")
+    full = simulate(dates, 0.2, 1.0, 0.3, 0.1, MODS, 3)
+    subset = simulate(dates, 0.2, 1.0, 0.3, 0.1, {"Marketing": 1.0, "Finance": 1.2}, 3)
+    np.testing.assert_array_equal(full.team("Finance"), subset.team("Finance"))
+    np.testing.assert_array_equal(full.team("Marketing"), subset.team("Marketing"))
+
+
+def test_empty_range():
+    df, events = simulate_metric_drift([], 0.2, 1.0, 0.3, 0.1, MODS, seed=0)
+    assert df.empty and events == []
@@ -0,0 +1,59 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from metric_drift import (
+    AVG_DIVERGENCE,
+    default_team_weights,
+    ensemble_bands,
+    generate_dates,
+    iter_ensemble_bands,
+    simulate,
+)
+from metric_drift.divergence import mean_pair_difference
+
+DATES = generate_dates(date(2024, 1, 1), date(2024, 6, 30), "Daily")
+PARAMS = (0.2, 1.0, 0.3, 0.1)
+
+
+@pytest.mark.parametrize("max_chunk_elements", [1, 500, 10_000])
+def test_bands_do_not_depend_on_chunk_size(max_chunk_elements):
+    weights = default_team_weights()
+    # The default budget holds the whole timeline in one slab
+    expected = ensemble_bands(DATES, *PARAMS, weights, replicates=50, seed=5)
+    chunks = list(iter_ensemble_bands(DATES, *PARAMS, weights, replicates=50, seed=5,
+                                      max_chunk_elements=max_chunk_elements))
+    assert len(chunks) > 1
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+
+
+def test_p50_tracks_mean_without_noise():
+    weights = default_team_weights()
+    bands = ensemble_bands(DATES, PARAMS[0], PARAMS[1], PARAMS[2], 0.0, weights, replicates=20, seed=1)
+    expected = simulate(DATES, PARAMS[0], PARAMS[1], PARAMS[2], 0.0, weights, 1)
+    for k, team in enumerate(expected.teams):
+        band = bands[bands["series"] == team]
+        np.testing.assert_allclose(band["p50"], expected.matrix[:, k])
+        np.testing.assert_allclose(band["p5"], band["p95"])
+    divergence = bands[bands["series"] == AVG_DIVERGENCE]["p50"]
+    np.testing.assert_allclose(divergence, mean_pair_difference(expected.matrix))
+
+
+def test_bands_are_ordered():
+    bands = ensemble_bands(DATES, *PARAMS, default_team_weights(), replicates=100, seed=2)
+    columns = ["p5", "p25", "p50", "p75", "p95"]
+    assert (np.diff(bands[columns].to_numpy(), axis=1) >= 0).all()
+    assert len(bands) == len(DATES) * (len(default_team_weights()) + 1)
+
+
+def test_single_team_has_no_divergence_band():
+    bands = ensemble_bands(DATES, *PARAMS, {"Product": 1.0}, replicates=10, seed=0)
+    assert set(bands["series"]) == {"Product"}
+
+
+def test_empty_range():
+    bands = ensemble_bands(DATES[:0], *PARAMS, default_team_weights(), replicates=10, seed=0)
+    assert list(bands.columns) == ["date", "day", "series", "p5", "p25", "p50", "p75", "p95"]
+    assert bands.empty
@@ -0,0 +1,56 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from metric_drift import Event, EventTimeline, load_events
+
+TEAMS = ["Finance", "Product", "Marketing"]
+
+
+def brute_force(event, t):
+    # One event's contribution at every day in ``t``, evaluated directly
+    ramp = (t - event.day) / event.ramp_days if event.ramp_days else 0.0
+    value = np.where(t >= event.full_day, 1.0, np.where(t >= event.day, ramp, 0.0)) * event.magnitude
+    if event.half_life:
+        decayed = event.magnitude * 2.0 ** (-(t - event.full_day) / event.half_life)
+        value = np.where(t >= event.full_day, decayed, value)
+    return value
+
+
+def test_timeline_matches_brute_force():
+    rng = np.random.default_rng(0)
+    events = []
+    for _ in range(2000):
+        shape = str(rng.choice(["step", "ramp"]))
+        half_life = None if rng.random() < 0.5 else float(rng.choice([7, 30.5, 90]))
+        events.append(Event(str(rng.choice(TEAMS)), int(rng.integers(0, 3650)), "", shape,
+                            float(rng.normal()), float(rng.integers(1, 60)) if shape == "ramp" else 0.0,
+                            half_life))
+    t = np.arange(3651)
+    expected = np.zeros((len(t), len(TEAMS)))
+    for event in events:
+        expected[:, TEAMS.index(event.team)] += brute_force(event, t)
+    np.testing.assert_allclose(EventTimeline(events).contributions(TEAMS, t), expected, atol=1e-9)
+
+
+def test_load_events_from_csv_and_json():
+    csv_text = "team,day,description,shape,magnitude,ramp_days,half_life\nFinance,10,a,ramp,2,5,\nProduct,20,b,step,,,30\n"
+    assert load_events(io.StringIO(csv_text)) == [
+        Event("Finance", 10, "a", "ramp", 2.0, 5.0),
+        Event("Product", 20, "b", half_life=30.0),
+    ]
+    payload = io.BytesIO(json.dumps({"events": [{"team": "Marketing", "day": 3}]}).encode())
+    assert load_events(payload) == [Event("Marketing", 3)]
+
+
+@pytest.mark.parametrize("record", [
+    {"team": "Finance"},
+    {"team": "Finance", "day": 1, "shape": "spike"},
+    {"team": "Finance", "day": 1, "colour": "red"},
+    {"team": "Finance", "day": 1, "shape": "ramp"},
+])
+def test_load_events_rejects_bad_records(record):
+    with pytest.raises(ValueError):
+        load_events(io.StringIO(json.dumps([record])))
@@ -0,0 +1,53 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from metric_drift import (
+    GRANULARITIES,
+    IncrementalSimulation,
+    default_team_weights,
+    generate_dates,
+    simulate,
+)
+
+PARAMS = (0.2, 1.0, 0.3, 0.1)
+
+
+@pytest.mark.parametrize("granularity", GRANULARITIES)
+def test_advance_matches_simulate(granularity):
+    # A mid-month start puts the first Month End period after the start date
+    start, end = date(2024, 1, 15), date(2025, 6, 1)
+    weights = default_team_weights()
+    simulation = IncrementalSimulation(start, granularity, *PARAMS, weights, seed=3)
+    simulation.advance(date(2024, 4, 20))
+    result, events = simulation.advance(end)
+
+    expected = simulate(generate_dates(start, end, granularity), *PARAMS, weights, 3)
+    np.testing.assert_array_equal(result.day, expected.day)
+    np.testing.assert_array_equal(result.dates, expected.dates)
+    np.testing.assert_array_equal(result.matrix, expected.matrix)
+    assert events == expected.events
+
+
+def test_repeated_advances_match_fresh_run():
+    start = date(2023, 3, 1)
+    weights = default_team_weights()
+    extended = IncrementalSimulation(start, "Daily", *PARAMS, weights, seed=11)
+    for end in (date(2023, 3, 20), date(2023, 9, 1), date(2024, 12, 31)):
+        extended.advance(end, chunk_periods=50)
+    fresh = IncrementalSimulation(start, "Daily", *PARAMS, weights, seed=11)
+    result, _ = fresh.advance(date(2024, 12, 31))
+
+    np.testing.assert_array_equal(extended.result.matrix, result.matrix)
+
+
+def test_earlier_end_date_rebuilds():
+    start = date(2024, 1, 1)
+    weights = default_team_weights()
+    simulation = IncrementalSimulation(start, "Weekly", *PARAMS, weights, seed=5)
+    simulation.advance(date(2025, 1, 1))
+    result, _ = simulation.advance(date(2024, 6, 1))
+
+    expected = simulate(generate_dates(start, date(2024, 6, 1), "Weekly"), *PARAMS, weights, 5)
+    np.testing.assert_array_equal(result.matrix, expected.matrix)
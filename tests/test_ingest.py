@@ -0,0 +1,87 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from metric_drift import ingest_logs
+
+START, END = date(2024, 1, 1), date(2024, 3, 31)
+
+
+def make_log(n_rows=5000, n_users=400, seed=3):
+    rng = np.random.default_rng(seed)
+    seconds = rng.integers(0, 100 * 86400, n_rows)
+    return pd.DataFrame({
+        "user_id": [f"u{k}" for k in rng.integers(0, n_users, n_rows)],
+        "timestamp": pd.Timestamp("2023-12-20") + pd.to_timedelta(seconds, unit="s"),
+        "event_type": rng.choice(["feature_use", "click", "open", "view"], n_rows),
+        "charge_amount": rng.choice([0.0, 0.0, 4.99, 9.99], n_rows),
+    })
+
+
+def expected_counts(log, granularity="Weekly"):
+    """Distinct users per team and period, straight from groupby().nunique()."""
+    result = ingest_logs(log.iloc[:0], START, END, granularity)
+    starts = pd.DatetimeIndex(result.dates)
+    log = log[(log["timestamp"] >= starts[0]) & (log["timestamp"] < pd.Timestamp(END) + pd.Timedelta(days=1))]
+    period = starts.searchsorted(log["timestamp"], side="right") - 1
+    kept = {
+        "Product": log["event_type"] == "feature_use",
+        "Finance": log["charge_amount"] > 0,
+        "Marketing": log["event_type"].isin(["click", "open"]),
+    }
+    expected = np.zeros((len(starts), len(kept)))
+    for k, mask in enumerate(kept.values()):
+        counts = log["user_id"][mask].groupby(period[mask.to_numpy()]).nunique()
+        expected[counts.index, k] = counts.to_numpy()
+    return expected
+
+
+def test_exact_counts_match_groupby():
+    log = make_log()
+    result = ingest_logs(log, START, END)
+    assert result.teams == ["Product", "Finance", "Marketing"]
+    np.testing.assert_array_equal(result.matrix, expected_counts(log))
+
+
+def test_exact_counts_ignore_missing_users():
+    log = make_log()
+    log.loc[::7, "user_id"] = None
+    result = ingest_logs(log, START, END, chunk_rows=999)
+    np.testing.assert_array_equal(result.matrix, expected_counts(log.dropna(subset=["user_id"])))
+
+
+def test_hll_within_error_bound():
+    log = make_log(n_rows=60000, n_users=20000)
+    exact = ingest_logs(log, START, END, "Monthly").matrix
+    approx = ingest_logs(log, START, END, "Monthly", method="hll").matrix
+    # Four standard errors of a precision-12 sketch
+    np.testing.assert_allclose(approx, exact, rtol=4 * 1.04 / np.sqrt(2 ** 12))
+
+
+@pytest.mark.parametrize("chunk_rows", [7, 37, 1000, 10_000])
+def test_csv_chunk_boundaries(tmp_path, chunk_rows):
+    log = make_log(n_rows=2000)
+    path = tmp_path / "events.csv"
+    log.to_csv(path, index=False)
+    result = ingest_logs(path, START, END, chunk_rows=chunk_rows)
+    np.testing.assert_array_equal(result.matrix, expected_counts(log))
+
+
+@pytest.mark.parametrize("chunk_rows", [7, 37, 1000, 10_000])
+def test_parquet_chunk_boundaries(tmp_path, chunk_rows):
+    pytest.importorskip("pyarrow")
+    log = make_log(n_rows=2000)
+    path = tmp_path / "events.parquet"
+    log.to_parquet(path, index=False)
+    result = ingest_logs(path, START, END, chunk_rows=chunk_rows)
+    np.testing.assert_array_equal(result.matrix, expected_counts(log))
+    with open(path, "rb") as handle:
+        np.testing.assert_array_equal(ingest_logs(handle, START, END, chunk_rows=chunk_rows).matrix,
+                                      result.matrix)
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError, match="distinct-count method"):
+        ingest_logs(make_log(10), START, END, method="sketch")
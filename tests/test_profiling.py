@@ -0,0 +1,49 @@
+import tracemalloc
+
+import pytest
+
+from metric_drift import StageTimer
+
+
+@pytest.fixture(autouse=True)
+def no_tracing():
+    if tracemalloc.is_tracing():
+        pytest.skip("tracemalloc is already tracing")
+    yield
+    tracemalloc.stop()
+
+
+def test_tracing_lasts_until_the_last_timer_finishes():
+    first = StageTimer(enabled=True, track_allocations=True)
+    second = StageTimer(enabled=True, track_allocations=True)
+    first.finish()
+    assert tracemalloc.is_tracing()
+    with second.stage("work"):
+        bytearray(1 << 20)
+    second.finish()
+    assert not tracemalloc.is_tracing()
+    assert second.records[0]["peak_bytes"] >= 1 << 20
+
+
+def test_finish_twice_releases_once():
+    first = StageTimer(enabled=True, track_allocations=True)
+    second = StageTimer(enabled=True, track_allocations=True)
+    first.finish()
+    first.finish()
+    assert tracemalloc.is_tracing()
+    second.finish()
+    assert not tracemalloc.is_tracing()
+
+
+def test_disabled_timer_records_nothing():
+    timer = StageTimer(enabled=False, track_allocations=True)
+    with timer.stage("work"):
+        pass
+    assert timer.records == [] and not tracemalloc.is_tracing()
+
+
+def test_unfinished_timer_releases_when_dropped():
+    timer = StageTimer(enabled=True, track_allocations=True)
+    assert tracemalloc.is_tracing()
+    del timer
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,62 @@
+from datetime import date
+
+import numpy as np
+
+from metric_drift import Scenario, ScenarioStore, default_team_weights, generate_dates, run_scenarios, simulate
+
+START, END = date(2024, 1, 1), date(2024, 12, 31)
+SCENARIOS = [
+    Scenario("Baseline"),
+    Scenario("No Marketing change", without_events=("Marketing",)),
+    Scenario("High drift", base_drift=0.6, team_weights={"Finance": 1.5}),
+]
+
+
+def test_scenarios_match_separate_runs():
+    results = run_scenarios(SCENARIOS, START, END, "Daily", seed=7)
+    dates = generate_dates(START, END, "Daily")
+    teams = list(default_team_weights())
+    for scenario in SCENARIOS:
+        expected = simulate(dates, scenario.base_drift, scenario.context_factor, scenario.seasonality,
+                            scenario.noise_level, scenario.weights(teams), 7,
+                            events=scenario.schedule((END - START).days))
+        np.testing.assert_array_equal(results[scenario.name].matrix, expected.matrix)
+
+
+def test_store_reloads_saved_scenarios(tmp_path):
+    store = ScenarioStore(tmp_path / "scenarios")
+    unsaved = run_scenarios(SCENARIOS, START, END, seed=7, store=store, save=False)
+    assert store.digests() == []
+    run_scenarios(SCENARIOS, START, END, seed=7, store=store)
+    assert len(store.digests()) == 3
+    reloaded = run_scenarios(SCENARIOS, START, END, seed=7, store=store)
+    for name, result in unsaved.items():
+        np.testing.assert_array_equal(reloaded[name].matrix, result.matrix)
+        np.testing.assert_array_equal(reloaded[name].dates, result.dates)
+        assert reloaded[name].teams == result.teams and reloaded[name].events == result.events
+
+
+def test_store_prunes_least_recently_used(tmp_path):
+    store = ScenarioStore(tmp_path, max_entries=2)
+    for k, drift in enumerate((0.1, 0.2, 0.3)):
+        run_scenarios([Scenario("Drift", base_drift=drift)], START, END, seed=k, store=store)
+    assert len(store.digests()) == 2
+    assert [record["base_drift"] for _, record in store.versions("Drift")] == [0.2, 0.3]
+
+
+def test_store_loading_counts_as_use(tmp_path):
+    store = ScenarioStore(tmp_path, max_entries=2)
+    first = [Scenario("First", base_drift=0.1)]
+    run_scenarios(first, START, END, store=store)
+    run_scenarios([Scenario("Second", base_drift=0.2)], START, END, store=store)
+    run_scenarios(first, START, END, store=store)
+    run_scenarios([Scenario("Third", base_drift=0.3)], START, END, store=store)
+    assert store.versions("Second") == []
+    assert [name for name in ("First", "Third") if store.versions(name)] == ["First", "Third"]
+
+
+def test_versions_skip_entries_pruned_meanwhile(tmp_path):
+    store = ScenarioStore(tmp_path)
+    run_scenarios(SCENARIOS, START, END, store=store)
+    (tmp_path / (store.digests()[0] + ".json")).unlink()
+    assert sum(len(store.versions(scenario.name)) for scenario in SCENARIOS) == 2
@@ -0,0 +1,92 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+from tornado.testing import AsyncHTTPTestCase
+
+from metric_drift import LRUCache, SimulationService
+from metric_drift.service import MAX_RUNS, make_app, parse_run
+
+GOOD = {"start_date": "2024-01-01", "end_date": "2024-06-30"}
+
+
+def make_service():
+    return SimulationService(ThreadPoolExecutor(2), cache=LRUCache(maxsize=16))
+
+
+@pytest.mark.parametrize("spec", [
+    {"start_date": "2024-06-30", "end_date": "2024-01-01"},
+    {"start_date": "2024-01-15", "end_date": "2024-01-20", "granularity": "Month End"},
+    dict(GOOD, events=[{"team": "Finance", "day": "x"}]),
+    dict(GOOD, events=[{"team": "Finance", "day": 3, "magnitude": "big"}]),
+    dict(GOOD, events=[{"team": "Finance"}]),
+    dict(GOOD, base_drift="nan"),
+    dict(GOOD, noise_level="inf"),
+    dict(GOOD, team_weights={"Finance": 1.0, "Product": "-inf"}),
+    {"start_date": "1900-01-01", "end_date": "2100-01-01", "granularity": "Daily"},
+])
+def test_parse_run_rejects_bad_runs(spec):
+    with pytest.raises(ValueError):
+        parse_run(spec)
+
+
+def test_parse_run_coerces_event_fields():
+    run = parse_run(dict(GOOD, events=[{"team": "Finance", "day": "3", "magnitude": "2"}]))
+    assert run["events"][0].day == 3 and run["events"][0].magnitude == 2.0
+
+
+def test_failed_run_does_not_fail_its_batch():
+    service = make_service()
+    good = parse_run(GOOD)
+    # Past validation, an empty range fails in the worker
+    bad = dict(good, start_date=date(2024, 6, 30), end_date=date(2024, 1, 1))
+    stats = asyncio.run(service.summaries([good, bad, good]))
+    assert stats[0] == stats[2] and len(stats[0]) == 5
+    assert isinstance(stats[1], Exception)
+    assert len(service.summary_cache) == 1
+
+
+def test_empty_summary_cache_is_kept():
+    cache = LRUCache(maxsize=4)
+    assert SimulationService(ThreadPoolExecutor(1), summary_cache=cache).summary_cache is cache
+
+
+class ServiceHTTPTest(AsyncHTTPTestCase):
+    def get_app(self):
+        return make_app(make_service())
+
+    def post(self, path, body):
+        return self.fetch(path, method="POST", body=json.dumps(body), raise_error=False)
+
+    def test_divergence(self):
+        response = self.post("/divergence", {"runs": [GOOD, dict(GOOD, seed=1)]})
+        assert response.code == 200
+        columns = json.loads(response.body)
+        assert len(columns["max_divergence"]) == 2 and columns["error"] == [None, None]
+
+    def test_bad_run_is_rejected(self):
+        bad = {"start_date": "2024-06-30", "end_date": "2024-01-01"}
+        assert self.post("/divergence", {"runs": [GOOD, bad]}).code == 400
+        assert self.post("/simulate", dict(GOOD, events=[{"team": "Finance", "day": "x"}])).code == 400
+
+    def test_too_many_runs_are_rejected(self):
+        response = self.post("/divergence", {"runs": [GOOD] * (MAX_RUNS + 1)})
+        assert response.code == 400
+
+    def test_simulate(self):
+        response = self.post("/simulate", dict(GOOD, granularity="Monthly"))
+        assert response.code == 200
+        assert len(json.loads(response.body)["date"]) == 6
+
+
+def test_background_server_listens_on_loopback(monkeypatch):
+    import metric_drift.service as service
+
+    calls = []
+    monkeypatch.setattr(service, "serve", lambda port, svc, address: calls.append(address) or asyncio.sleep(0))
+    monkeypatch.setattr(service, "_background", {})
+    service.serve_in_background(0).join()
+    service.serve_in_background(1, address="").join()
+    assert calls == [service.DEFAULT_ADDRESS, ""]
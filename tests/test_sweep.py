@@ -0,0 +1,25 @@
+from datetime import date
+
+import numpy as np
+
+from metric_drift import latin_hypercube, run_sweep
+from metric_drift.sweep import STATISTICS, sweep_ranges
+
+TEAMS = ["Finance", "Product", "Marketing"]
+
+
+def test_results_do_not_depend_on_batching_or_workers():
+    samples = latin_hypercube(24, sweep_ranges(TEAMS), seed=5)
+    args = (samples, date(2024, 1, 1), date(2024, 6, 30), "Weekly")
+    serial = run_sweep(*args, teams=TEAMS, seed=9, max_workers=1, batch_size=24)
+    batched = run_sweep(*args, teams=TEAMS, seed=9, max_workers=1, batch_size=5)
+    parallel = run_sweep(*args, teams=TEAMS, seed=9, max_workers=2, batch_size=7)
+    for name in STATISTICS:
+        np.testing.assert_array_equal(serial[name], batched[name])
+        np.testing.assert_array_equal(serial[name], parallel[name])
+
+
+def test_latin_hypercube_covers_every_stratum():
+    samples = latin_hypercube(50, {"base_drift": (0.0, 1.0)}, seed=1)
+    strata = np.floor(samples["base_drift"] * 50).astype(int)
+    assert sorted(strata) == list(range(50))